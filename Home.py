@@ -1,9 +1,16 @@
 import streamlit as st
+from app.utils.filters import current_user
 from app.utils.load import load_css
+from app.utils.warmup import start_warmup
 
 # ----------- CONFIG ----------- #
 st.set_page_config(page_title="Accueil - Dashboard Airbnb Paris", layout="wide")
 st.markdown(load_css("app/assets/styles.css"), unsafe_allow_html=True)
+current_user()  # jeton des favoris (?user=...) gardé en session avant de changer de page
+
+# Données et index préparés en arrière-plan pendant la lecture de l'accueil (déjà lancé
+# au démarrage du serveur avec python -m app.serve)
+warmup = start_warmup()
 
 st.sidebar.header("Changer de 🎨 Thème -> en Haut à droite")
 
@@ -58,6 +65,31 @@ with col2:
     if st.button("📈 Accéder à la vue Hôte"):
         st.switch_page("pages/hote.py")
 
+# ----------- PRÉPARATION DES DONNÉES ----------- #
+def show_readiness():
+    if warmup.pret:
+        st.success(f"✅ Données et index prêts ({warmup.duree():.1f} s) : les vues s'ouvrent sans attente.")
+    elif warmup.erreur is not None:
+        st.warning("⚠️ Préparation interrompue : les données seront chargées à l'ouverture d'une vue.")
+    elif warmup.demarre:
+        faites = len(warmup.etapes)
+        st.progress(faites / (warmup.total or 1),
+                    text=f"⏳ Préparation des données : {warmup.en_cours or '…'} "
+                         f"({faites}/{warmup.total or '…'}, {warmup.duree():.0f} s)")
+
+
+@st.fragment(run_every=1)
+def show_readiness_live():
+    show_readiness()
+    if warmup.fin is not None:
+        st.rerun()  # préparation terminée : l'accueil redevient statique
+
+
+if warmup.demarre and warmup.fin is None:
+    show_readiness_live()
+else:
+    show_readiness()
+
 # ----------- FOOTER (optionnel) ----------- #
 st.markdown("---")
 st.caption("💡 Données issues de InsideAirbnb. Développé dans le cadre d'un projet pédagogique.")
\ No newline at end of file
@@ -0,0 +1,109 @@
+import argparse
+import datetime
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+import urllib.error
+
+from app.utils.anomalies import PriceAnomalies
+from app.utils.clusters import ClusterIndex
+from app.utils.cube import StatsCube
+from app.utils.hexgrid import HexGrid
+from app.utils.index import FilterIndex
+from app.utils.load import (
+    BUNDLE_DIR, SNAPSHOT_FORMAT, _source_version, data_source, read_listings, snapshot_path
+)
+from app.utils.neighbors import NeighborIndex
+from app.utils.pricing import PriceModel
+
+# Artefacts précalculés : nom du fichier -> constructeur à partir de la table des annonces
+ARTEFACTS = {
+    "filtres": FilterIndex,
+    "cube": StatsCube,
+    "clusters": ClusterIndex,
+    "hexagones": HexGrid,
+    "anomalies": PriceAnomalies,
+    "voisins": NeighborIndex,
+    "prix": PriceModel,
+}
+FICHIERS_DONNEES = ["listings.parquet", "mois.npy", "dispos.npy"]
+# Échecs de lecture de la source (réseau, HTTP, fichier absent)
+ERREURS_SOURCE = (urllib.error.URLError, ConnectionError, TimeoutError, FileNotFoundError)
+
+
+class SourceIndisponible(Exception):
+    """La source des annonces n'a pas pu être lue : le build est sans objet."""
+
+
+def build(source, out=BUNDLE_DIR):
+    """Construit le bundle d'artefacts de `source` dans `out/<version>` et le rend courant.
+
+    Le bundle contient les annonces typées, la matrice de saisonnalité et les index
+    (filtres, cube de statistiques, regroupement cartographique, grille de densité,
+    anomalies de prix, plus proches voisins) et le modèle de prix suggéré, que load_data
+    et les pages relisent directement au démarrage.
+    """
+    timings = {}
+    debut = time.perf_counter()
+    try:
+        # Version lue avant le snapshot : une source modifiée entre les deux invalide le
+        # bundle (bundle_dir) au lieu de le faire passer pour à jour
+        version_source = _source_version(source)
+        snapshot = snapshot_path(source)
+    except ERREURS_SOURCE as exc:
+        raise SourceIndisponible(f"{source} : {exc}") from exc
+    timings["snapshot"] = time.perf_counter() - debut
+
+    version = os.path.basename(snapshot)
+    path = os.path.join(out, version)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+    for fichier in FICHIERS_DONNEES:
+        if os.path.exists(os.path.join(snapshot, fichier)):
+            shutil.copy2(os.path.join(snapshot, fichier), os.path.join(tmp, fichier))
+
+    df = read_listings(tmp)
+    for nom, construire in ARTEFACTS.items():
+        debut = time.perf_counter()
+        with open(os.path.join(tmp, f"{nom}.pkl"), "wb") as f:
+            pickle.dump(construire(df), f, protocol=pickle.HIGHEST_PROTOCOL)
+        timings[nom] = time.perf_counter() - debut
+
+    manifest = {
+        "version": version, "source": source, "source_version": version_source,
+        "format": SNAPSHOT_FORMAT,
+        "annonces": len(df), "construit_le": datetime.datetime.now().isoformat(timespec="seconds"),
+        "artefacts": list(ARTEFACTS), "durees": {k: round(v, 3) for k, v in timings.items()},
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    pointer = os.path.join(out, "current")
+    with open(f"{pointer}.tmp", "w") as f:
+        f.write(version)
+    os.replace(f"{pointer}.tmp", pointer)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Précalcul des artefacts du dashboard.")
+    parser.add_argument("--source", default=data_source(), help="CSV enrichi (URL ou chemin)")
+    parser.add_argument("--out", default=BUNDLE_DIR, help="dossier des bundles")
+    args = parser.parse_args(argv)
+    try:
+        manifest = build(args.source, args.out)
+    except SourceIndisponible as exc:
+        # Seul cas toléré (build de l'image hors ligne) : le dashboard chargera à chaud.
+        # Toute autre erreur fait échouer la commande.
+        print(f"Précalcul ignoré, source indisponible ({exc})", file=sys.stderr)
+        return
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
 import pandas as pd
-import numpy as np
 import streamlit as st
-import plotly.express as px
-from app.utils.filters import detect_bons_plans
+from app.components.export import render_export_button
+from app.components.figures import box_figure, cached_figure, scatter_figure
+from app.components.tables import render_paginated_table
+from app.utils import analytics
+from app.utils.export import COLONNES_SELECTION
+from app.utils.favorites import favorites_frame
+from app.utils.filters import add_favorites, remove_favorites, session_favorites
+
+# plotly n'est importé que par les fonctions qui tracent : importer ce module (pages) ne
+# coûte pas le chargement de plotly, préchargé en arrière-plan par app/utils/warmup.py
 
 
 def render_title_with_info(title: str, info_text: str):
@@ -49,15 +56,12 @@ def render_title_with_info(title: str, info_text: str):
     """, unsafe_allow_html=True)
 
 
-def show_kpi_block(df_filtered, df_global):
-    prix_moyen = df_filtered["price"].mean()
-    prix_median_global = df_global["price"].median()
-    dispo_moy = df_filtered["availability_365"].mean()
-    review_moy = df_filtered["number_of_reviews"].mean()
-    nb_annonces = len(df_filtered)
-
-    bons_plans = detect_bons_plans(df_filtered)
-    taux_bons_plans = (len(bons_plans) / nb_annonces) * 100 if nb_annonces > 0 else 0
+def show_kpi_block(ctx):
+    kpis = analytics.kpis(ctx)
+    prix_moyen = kpis["prix_moyen"]
+    dispo_moy = kpis["dispo_moyenne"]
+    review_moy = kpis["reviews_moyen"]
+    taux_bons_plans = kpis["taux_bons_plans"]
 
     st.markdown("### 📌 Indicateurs clés du marché sélectionné")
     col1, col2, col3, col4 = st.columns(4)
@@ -65,7 +69,7 @@ def show_kpi_block(df_filtered, df_global):
     col1.metric(
         label="💶 Prix moyen (€)",
         value=f"{prix_moyen:.2f}",
-        delta=f"{prix_moyen - prix_median_global:+.2f} vs médiane Paris",
+        delta=f"{kpis['ecart_mediane_paris']:+.2f} vs médiane Paris",
         help="Prix moyen des logements sélectionnés. Comparé ici à la médiane sur tout Paris."
     )
     col2.metric(
@@ -88,17 +92,15 @@ def show_kpi_block(df_filtered, df_global):
     )
 
 
-def show_quartier_comparison(df):
+def show_quartier_comparison(ctx):
+    import plotly.express as px
     render_title_with_info(
         "🏙️ Comparaison entre quartiers sélectionnés",
         "Ce graphique permet de comparer les prix moyens entre quartiers. La taille des bulles"
         "représente le nombre d’annonces, et la couleur indique la disponibilité moyenne."
     )
-    stats = (
-        df.groupby("neighbourhood_cleansed")
-        .agg(prix=("price", "mean"), reviews=("number_of_reviews", "mean"),
-             dispo=("availability_365", "mean"), annonces=("id", "count"))
-        .reset_index()
+    stats = analytics.group_stats(ctx).rename(
+        columns={"prix_moyen": "prix", "reviews_moyen": "reviews", "dispo_moyenne": "dispo"}
     )
     fig = px.scatter(
         stats.sort_values("prix", ascending=False),
@@ -110,123 +112,178 @@ def show_quartier_comparison(df):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_price_distribution(df):
+def show_price_distribution(ctx):
+    import plotly.express as px
     render_title_with_info(
         "📊 Distribution des prix",
         "Histogramme des prix des logements filtrés. La ligne rouge verticale représente le prix"
         "médian observé sur la sélection."
     )
-    fig = px.histogram(df, x="price", nbins=40, title="")
-    fig.add_vline(x=df["price"].median(), line_dash="dash", line_color="red",
+    fig = px.histogram(ctx.df, x="price", nbins=40, title="")
+    fig.add_vline(x=ctx.median("price"), line_dash="dash", line_color="red",
                   annotation_text="Prix médian", annotation_position="top right")
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_availability_vs_reviews(df):
+def show_availability_vs_reviews(ctx):
     render_title_with_info(
         "📈 Reviews vs Disponibilité",
         "Chaque point représente un logement. L’axe des x indique la disponibilité sur l’année,"
         "l’axe des y montre le nombre total de reviews. La taille reflète les reviews mensuels, et"
         "la couleur le type de logement."
     )
+    fig = cached_figure("availability_vs_reviews", ctx.df, _availability_vs_reviews_figure,
+                        version=ctx.version)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _availability_vs_reviews_figure(df):
     scatter_df = df[df["reviews_per_month"].notna()].copy()
     scatter_df["reviews_per_month"] = pd.to_numeric(scatter_df["reviews_per_month"],
                                                     errors="coerce")
-    fig = px.scatter(
+    return scatter_figure(
         scatter_df,
         x="availability_365", y="number_of_reviews",
         size="reviews_per_month", color="room_type",
         hover_name="name", opacity=0.6,
         title=""
     )
-    st.plotly_chart(fig, use_container_width=True)
 
 
-def show_price_boxplot(df):
+def show_price_boxplot(ctx):
     render_title_with_info(
         "📦 Dispersion des prix par quartier",
         "Boxplot : médiane, étendue, et outliers des prix dans chaque quartier. Cela permet de voir"
         "la variabilité des tarifs dans une même zone."
     )
-    fig = px.box(
-        df, x="neighbourhood_cleansed", y="price", color="room_type",
-        points="all"
-    )
+    fig = cached_figure("price_boxplot", ctx.df, box_figure,
+                        "neighbourhood_cleansed", "price", "room_type", "all",
+                        version=ctx.version)
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_tarif_suggestion(df):
+def show_tarif_suggestion(ctx):
     st.subheader("💡 Suggestions d'ajustement tarifaire", help=(
-        "Ce tableau repère les **logements dont le tarif est anormalement élevé** dans leur "
-        "**quartier et type de logement**. Utile pour détecter des anomalies statistiques via"
-        "le Z-score."
+        "Ce tableau repère les **logements dont le tarif est anormalement élevé ou bas** par "
+        "rapport aux annonces de même **quartier et type de logement** dans tout Paris. Le "
+        "score mesure l'écart à la médiane du groupe, en écarts absolus médians (MAD)."
     ))
-    seuil = 2  # z-score
-    grouped = df.groupby(["neighbourhood_cleansed", "room_type"])["price"]
-    mean_std = grouped.agg(["mean", "std"]).reset_index()
-    df_merged = df.merge(mean_std, on=["neighbourhood_cleansed", "room_type"])
-    df_merged["zscore"] = (df_merged["price"] - df_merged["mean"]) / df_merged["std"]
-    suspects = df_merged[df_merged["zscore"] > seuil]
-    st.markdown(f"🔍 **{len(suspects)} logements au prix atypique détectés** (z > {seuil})")
-    st.dataframe(
-        suspects[["name", "neighbourhood_cleansed", "room_type", "price", "zscore"]]
-        .sort_values("zscore", ascending=False),
-        use_container_width=True,
-        height=400
-    )
-
-
-def show_automatic_reco_table(df):
+    seuil = 2  # score robuste
+    sens = st.radio("Tarifs", ["haut", "bas"], horizontal=True, key="sens_tarifs",
+                    format_func={"haut": "📈 Surtarifés", "bas": "📉 Sous-tarifés"}.get)
+    suspects = ctx.resultat(analytics.price_outliers, seuil, sens)
+    st.markdown(f"🔍 **{len(suspects)} logements au prix atypique détectés** "
+                f"(score {'>' if sens == 'haut' else '<'} {'' if sens == 'haut' else '-'}{seuil})")
+    render_paginated_table(suspects, list(suspects.columns), key=f"table_tarifs_{sens}",
+                           version=ctx.version)
+
+
+def show_nearest_comparables(ctx, voisins):
+    import plotly.express as px
+    st.subheader("📍 Vos concurrents les plus proches", help=(
+        "Cherchez une annonce de votre sélection (nom ou id) ou saisissez une position : le "
+        "tableau liste les **logements du même type les plus proches** dans tout Paris, dans "
+        "le rayon choisi, et résume leur distribution de prix."
+    ))
+    df = ctx.df_global
+    reference = st.radio("Référence", ["annonce", "position"], horizontal=True,
+                         key="voisins_reference",
+                         format_func={"annonce": "🏠 Une annonce", "position": "📌 Une position"}.get)
+    col1, col2, col3 = st.columns(3)
+    if reference == "annonce":
+        if ctx.df.empty:
+            st.info("Aucune annonce dans la sélection.")
+            return
+        # Seules les premières correspondances de la recherche sont envoyées au navigateur,
+        # pas les milliers d'annonces de la sélection
+        texte = col1.text_input("Rechercher une annonce", key="voisins_recherche",
+                                placeholder="Nom ou id")
+        positions, trouvees = analytics.search_listings(ctx, texte)
+        if not trouvees:
+            col1.info("Aucune annonce de la sélection ne correspond.")
+            return
+        noms = ctx.df["name"]
+        exclure = col1.selectbox("Annonce", positions, key="voisins_annonce",
+                                 format_func=lambda position: noms.get(position, position))
+        if trouvees > len(positions):
+            col1.caption(f"{len(positions)} premières sur {trouvees} : précisez la recherche.")
+        annonce = df.iloc[exclure]
+        lat, lon, room_type = annonce["latitude"], annonce["longitude"], annonce["room_type"]
+        col2.metric("💶 Prix de l'annonce (€)", f"{annonce['price']:.0f}")
+    else:
+        exclure = None
+        centre = ctx.df if len(ctx) else df  # position proposée : centre de la sélection
+        lat = col1.number_input("Latitude", value=float(centre["latitude"].median()),
+                                format="%.5f", key="voisins_lat")
+        lon = col1.number_input("Longitude", value=float(centre["longitude"].median()),
+                                format="%.5f", key="voisins_lon")
+        room_type = col2.selectbox("Type de logement", sorted(df["room_type"].dropna().unique()),
+                                   key="voisins_type")
+    k = col3.slider("Nombre de concurrents", 5, 50, 10, key="voisins_k")
+    rayon = col3.slider("Rayon (km)", 0.2, 5.0, 1.0, step=0.1, key="voisins_rayon")
+
+    proches = analytics.comparables(ctx, voisins, lat, lon, room_type, k, rayon, exclure)
+    if proches.empty:
+        st.info("Aucun logement de ce type dans ce rayon.")
+        return
+    distribution = analytics.price_distribution(proches)
+    cols = st.columns(4)
+    cols[0].metric("🏘️ Concurrents", distribution["annonces"])
+    cols[1].metric("💰 Prix médian (€)", f"{distribution['median']:.0f}")
+    cols[2].metric("↕️ Écart interquartile (€)",
+                   f"{distribution['q1']:.0f} – {distribution['q3']:.0f}")
+    cols[3].metric("📏 Distance max (km)", f"{proches['distance_km'].max():.2f}")
+    col4, col5 = st.columns([3, 2])
+    col4.dataframe(proches, use_container_width=True, height=300)
+    fig = px.box(proches, x="price", points="all", hover_name="name", title="")
+    col5.plotly_chart(fig, use_container_width=True)
+
+
+def show_automatic_reco_table(ctx):
     st.subheader("🧠 Recommandations automatiques", help=(
         "Ce tableau liste les annonces avec un **prix élevé**, mais des **performances faibles** "
         "(peu de reviews ou faible disponibilité). Elles sont potentiellement à revoir pour gagner "
-        "en visibilité ou taux de réservation."
+        "en visibilité ou taux de réservation. Le **prix suggéré** et sa fourchette viennent d'un "
+        "modèle de prix (quartier, type, position, disponibilité, avis) entraîné sur tout Paris."
     ))
-    prix_75 = df["price"].quantile(0.75)
-    nb_reviews_med = df["number_of_reviews"].median()
-    dispo_med = df["availability_365"].median()
-    a_revoir = df[
-        (df["price"] > prix_75) &
-        (
-            (df["number_of_reviews"] < nb_reviews_med) |
-            (df["availability_365"] < dispo_med)
-        )
-    ]
+    # Les annonces au plus faible rapport avis / prix en premier
+    a_revoir = ctx.resultat(analytics.recommendations)
     st.warning(f"⚠️ {len(a_revoir)} annonces semblent positionnées trop haut en prix")
-    # ← Here we include listing_url alongside the other columns
-    st.dataframe(
-        a_revoir[
-            ["name", "neighbourhood_cleansed", "price",
-             "availability_365", "number_of_reviews", "listing_url"]
-        ].drop_duplicates(),
-        use_container_width=True,
-        height=400
-    )
+    render_paginated_table(a_revoir, list(a_revoir.columns), key="table_reco",
+                           version=ctx.version)
+    render_export_button(a_revoir, list(a_revoir.columns), "recommandations", key="export_reco")
 
 
-def show_room_type_pie(df):
+def show_selection_export(ctx):
+    st.subheader("📥 Exporter la sélection", help=(
+        "Télécharge les annonces correspondant à vos filtres (CSV, Parquet ou Excel si "
+        "disponible). Le fichier est généré au clic."
+    ))
+    render_export_button(ctx.df, COLONNES_SELECTION, "selection", key="export_selection")
+
+
+def show_room_type_pie(ctx):
+    import plotly.express as px
     render_title_with_info(
         "🏘️ Répartition des types de logement",
         " Ce diagramme circulaire montre la proportion de chaque type de logement (entier, chambre"
         " privée, etc.) dans votre sélection. Utile pour comprendre l’offre dominante."
     )
-    counts = df["room_type"].value_counts().reset_index()
-    counts.columns = ["room_type", "count"]
+    counts = analytics.room_type_counts(ctx)
     fig = px.pie(counts, names="room_type", values="count", hole=0.4)
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_price_summary_bar(df):
+def show_price_summary_bar(ctx):
+    import plotly.express as px
     render_title_with_info(
         "📉 Prix moyen par quartier",
         " Visualisation combinée : prix moyen par quartier, écart-type (barres d’erreur) et médiane"
         " (valeurs affichées). Permet d’apprécier la stabilité ou dispersion des tarifs."
     )
-    summary = (
-        df.groupby("neighbourhood_cleansed")["price"]
-        .agg(["mean", "median", "std"])
-        .reset_index()
-        .rename(columns={"mean": "Prix moyen", "median": "Prix médian", "std": "Écart-type"})
+    summary = analytics.group_stats(ctx).rename(
+        columns={"prix_moyen": "Prix moyen", "prix_median": "Prix médian",
+                 "prix_std": "Écart-type"}
     )
     fig = px.bar(
         summary,
@@ -241,68 +298,92 @@ def show_price_summary_bar(df):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_bons_plans_table(df):
+def show_bons_plans_table(ctx):
     render_title_with_info(
         "💎 Bons plans (automatiques)",
         "Ces logements ont un excellent compromis entre prix bas, bonne disponibilité et"
         " bon nombre d’avis. Sélectionnez ceux que vous souhaitez enregistrer comme favoris."
     )
 
-    # Initialisation de la shortlist si besoin
-    if "shortlist" not in st.session_state:
-        st.session_state["shortlist"] = []
-
+    df = ctx.resultat(analytics.bons_plans)
     if df.empty:
         st.info("Aucun bon plan ne correspond actuellement à vos filtres.")
         return
 
-    # ▶️ On retire les éventuels doublons (ici basé sur le nom,
-    #    ou remplacez 'name' par l'identifiant unique si vous en avez un)
-    df_unique = df.drop_duplicates(subset=["name"])
+    # 1️⃣ Affichage de la page courante (une ligne par logement depuis le chargement)
+    page = render_paginated_table(df, analytics.COLONNES_BONS_PLANS, key="table_bons_plans",
+                                  version=ctx.version)
+    render_export_button(df, analytics.COLONNES_BONS_PLANS, "bons_plans", key="export_bons_plans")
+
+    # 2️⃣ Multi-select pour ajouter aux favoris (par identifiant d'annonce), parmi la page :
+    # l'ajout se fait au choix, puis le widget est vidé
+    noms = dict(zip(page["id"].tolist(), page["name"].tolist()))
+    st.multiselect("➕ Ajouter aux favoris", options=list(noms), format_func=noms.get,
+                   key="ajouter_favoris", on_change=_ajouter_favoris)
+
+    # 3️⃣ Seuls les identifiants absents des favoris ont été enregistrés
+    ajoutes = st.session_state.pop("favoris_ajoutes", None)
+    if ajoutes:
+        st.success(f"{len(ajoutes)} logement(s) ajouté(s) aux favoris ✅")
+    elif ajoutes is not None:
+        st.info("Ce logement est déjà dans vos favoris.")
+
+
+def _ajouter_favoris():
+    # Rappel exécuté avant le rerun : le choix n'est enregistré qu'une fois, et un favori
+    # retiré ensuite n'est pas réinséré par un widget resté coché
+    choix = st.session_state["ajouter_favoris"]
+    if choix:
+        st.session_state["favoris_ajoutes"] = add_favorites(choix)
+    st.session_state["ajouter_favoris"] = []
+
+
+def show_favorites(ctx):
+    st.subheader("🧺 Vos favoris")
+    favoris = session_favorites()
+    if not favoris:
+        st.info("Aucun favori sélectionné pour le moment.")
+        return
 
-    # 1️⃣ Affichage de la table scrollable sans doublons
-    st.dataframe(
-        df_unique[["name", "neighbourhood_cleansed", "price", "availability_365",
-                   "number_of_reviews"]],
-        use_container_width=True,
-        height=400
-    )
+    # Jointure des identifiants sur les annonces au moment du rendu
+    favs_df = favorites_frame(ctx.df_global, favoris)
+    st.dataframe(favs_df[analytics.COLONNES_BONS_PLANS], use_container_width=True)
+    render_export_button(favs_df, analytics.COLONNES_BONS_PLANS, "favoris", key="export_favoris")
 
-    # 2️⃣ Multi-select pour ajouter aux favoris
-    noms = df_unique["name"].tolist()
-    selection = st.multiselect("➕ Ajouter aux favoris", options=noms)
+    noms = dict(zip(favs_df["id"].tolist(), favs_df["name"].tolist()))
+    retirer = st.multiselect("➖ Retirer des favoris", options=list(noms),
+                             format_func=noms.get, key="retirer_favoris")
+    st.button("Retirer", disabled=not retirer, on_click=_retirer_favoris)
 
-    # 3️⃣ Pour chaque sélection non encore dans la shortlist, on ajoute
-    for nom in selection:
-        if nom not in [item["name"] for item in st.session_state["shortlist"]]:
-            row = df_unique[df_unique["name"] == nom].iloc[0]
-            st.session_state["shortlist"].append(row.to_dict())
 
-    if selection:
-        st.success(f"{len(selection)} logement(s) ajouté(s) aux favoris ✅")
+def _retirer_favoris():
+    # Rappel exécuté avant le rerun : le tableau affiché tient déjà compte du retrait
+    remove_favorites(st.session_state["retirer_favoris"])
+    st.session_state["retirer_favoris"] = []
 
 
-def show_boxplot_quartiers(df):
+def show_boxplot_quartiers(ctx):
     render_title_with_info(
         "📦 Prix par quartier",
         "Chaque boîte représente la distribution des prix dans un quartier donné : médiane, étendue"
         " et valeurs extrêmes. Permet d’observer les zones les plus stables ou variables."
     )
-    fig = px.box(df, x="neighbourhood_cleansed", y="price", points="outliers")
+    fig = cached_figure("boxplot_quartiers", ctx.df, box_figure,
+                        "neighbourhood_cleansed", "price", None, "outliers",
+                        version=ctx.version)
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_summary_bar_chart(df):
+def show_summary_bar_chart(ctx):
+    import plotly.express as px
     render_title_with_info(
         "📉 Prix moyens par quartier",
         "Ce graphique simplifie la lecture des tarifs moyens par quartier, en indiquant aussi leur"
         " variabilité (écart-type) et la médiane (valeur affichée)."
     )
-    stats = (
-        df.groupby("neighbourhood_cleansed")["price"]
-        .agg(["mean", "median", "std"])
-        .reset_index()
-        .rename(columns={"mean": "Prix moyen", "median": "Prix médian", "std": "Écart-type"})
+    stats = analytics.group_stats(ctx).rename(
+        columns={"prix_moyen": "Prix moyen", "prix_median": "Prix médian",
+                 "prix_std": "Écart-type"}
     )
     fig = px.bar(stats, x="neighbourhood_cleansed", y="Prix moyen", error_y="Écart-type",
                  text="Prix médian")
@@ -310,24 +391,17 @@ def show_summary_bar_chart(df):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_top_deals_score(df):
+def show_top_deals_score(ctx):
+    import plotly.express as px
     render_title_with_info(
         "🏅 Meilleurs rapports qualité/prix",
         "Classement des quartiers selon un score qualité/prix (avis / prix). "
         "Idéal pour identifier les zones où les logements bien notés sont abordables."
     )
-    df = df[df["price"] > 0].copy()
-    df["score_qp"] = df["number_of_reviews"] / df["price"]
-    df["score_qp"] = df["score_qp"].replace([np.inf, -np.inf], np.nan).fillna(0)
-
-    top_deals = df.groupby("neighbourhood_cleansed").apply(
-        lambda g: g.sort_values("score_qp", ascending=False).head(3)
-    ).reset_index(drop=True)
-
-    summary = top_deals.groupby("neighbourhood_cleansed")["score_qp"].mean().reset_index()
+    summary = analytics.top_deals(ctx, k=3)
 
     fig = px.bar(
-        summary.sort_values("score_qp", ascending=False),
+        summary,
         x="neighbourhood_cleansed",
         y="score_qp",
         title="",
@@ -336,11 +410,28 @@ def show_top_deals_score(df):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_kpi_block_voyageur(df_filtered):
-    prix_median = df_filtered["price"].median()
-    avis_moyens = df_filtered["number_of_reviews"].mean()
-    dispo_moyenne = df_filtered["availability_365"].mean()
-    nb_annonces = len(df_filtered)
+def show_price_evolution(ctx, evolution):
+    import plotly.express as px
+    render_title_with_info(
+        "📈 Évolution des prix",
+        "Prix médian par quartier à chaque snapshot InsideAirbnb ingéré. Permet de suivre la"
+        " tendance du marché dans les quartiers sélectionnés."
+    )
+    fig = px.line(
+        analytics.price_evolution(ctx, evolution), x="snapshot", y="price", color="neighbourhood_cleansed", markers=True,
+        labels={"snapshot": "Snapshot", "price": "Prix médian (€)",
+                "neighbourhood_cleansed": "Quartier"},
+        title=""
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def show_kpi_block_voyageur(ctx):
+    kpis = analytics.kpis(ctx)
+    prix_median = kpis["prix_median"]
+    avis_moyens = kpis["reviews_moyen"]
+    dispo_moyenne = kpis["dispo_moyenne"]
+    nb_annonces = kpis["annonces"]
 
     st.markdown("### 📌 Résumé de votre sélection")
     col1, col2, col3, col4 = st.columns(4)
@@ -368,7 +459,8 @@ def show_kpi_block_voyageur(df_filtered):
     )
 
 
-def show_seasonality_bar(df):
+def show_seasonality_bar(ctx):
+    import plotly.express as px
     render_title_with_info(
         "📆 Saisonnalité des logements",
         "Cette visualisation montre le **nombre moyen de jours disponibles par mois**, "
@@ -376,18 +468,11 @@ def show_seasonality_bar(df):
         "creuses."
     )
 
-    if "month" not in df.columns or "nb_jours_dispos" not in df.columns:
+    month_summary = analytics.seasonality(ctx)
+    if month_summary is None:
         st.info("Les données de saisonnalité ne sont pas disponibles.")
         return
 
-    # Regrouper par mois (format YYYY-MM)
-    month_summary = (
-        df.groupby("month")["nb_jours_dispos"]
-        .mean()
-        .reset_index()
-        .sort_values("month")
-    )
-
     # Affichage
     fig = px.bar(
         month_summary,
@@ -397,3 +482,96 @@ def show_seasonality_bar(df):
         title=""
     )
     st.plotly_chart(fig, use_container_width=True)
+
+
+def show_seasonality_heatmap(ctx):
+    render_title_with_info(
+        "🗓️ Occupation par quartier et par mois",
+        "Taux d’occupation estimé : part des jours du mois où les logements sélectionnés ne sont"
+        " **pas disponibles** à la réservation (réservés ou bloqués par l’hôte). Plus la case est"
+        " foncée, plus le quartier est demandé ce mois-là."
+    )
+    axe = st.radio("Lignes", ["quartier", "type"], horizontal=True, key="saison_axe",
+                   format_func={"quartier": "🏘️ Par quartier",
+                                "type": "🛏️ Par type de logement"}.get)
+    matrice = analytics.seasonality_matrix(ctx, axe)
+    if matrice is None:
+        st.info("Les données de saisonnalité ne sont pas disponibles.")
+        return
+    if matrice.empty:
+        st.info("Aucune annonce dans la sélection.")
+        return
+    # Même sélection et même axe : figure réutilisée d'une exécution à l'autre
+    fig = cached_figure("saison_heatmap", ctx.df,
+                        lambda df, axe: _seasonality_heatmap_figure(matrice), axe,
+                        version=ctx.version)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _seasonality_heatmap_figure(matrice):
+    import plotly.express as px
+    return px.imshow(
+        matrice, aspect="auto", zmin=0, zmax=100, color_continuous_scale="RdPu",
+        labels={"x": "Mois", "y": "", "color": "Occupation (%)"}, title=""
+    )
+
+
+def show_seasonality_trend(ctx):
+    render_title_with_info(
+        "📈 Tendance de l’occupation",
+        "Occupation estimée de la sélection chaque mois, et sa moyenne glissante sur "
+        f"{analytics.FENETRE_TENDANCE} mois qui lisse les variations ponctuelles."
+    )
+    tendance = analytics.seasonality_trend(ctx)
+    if tendance is None:
+        st.info("Les données de saisonnalité ne sont pas disponibles.")
+        return
+    fig = cached_figure("saison_tendance", ctx.df,
+                        lambda df: _seasonality_trend_figure(tendance), version=ctx.version)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _seasonality_trend_figure(tendance):
+    import plotly.express as px
+    return px.line(
+        tendance.rename(columns={"occupation": "Occupation",
+                                 "tendance": "Moyenne glissante"}),
+        x="month", y=["Occupation", "Moyenne glissante"], markers=True,
+        labels={"month": "Mois", "value": "Occupation (%)", "variable": ""}, title=""
+    )
+
+
+def show_peak_offpeak(ctx):
+    render_title_with_info(
+        "🌞 Haute et basse saison",
+        f"Les {analytics.MOIS_SAISON} mois les plus et les moins occupés de la sélection, et "
+        "l’occupation de chaque quartier sur ces deux périodes : les quartiers à fort écart "
+        "sont les plus saisonniers."
+    )
+    if ctx.saison is None:
+        st.info("Les données de saisonnalité ne sont pas disponibles.")
+        return
+    saisons = analytics.peak_offpeak(ctx)
+    if saisons is None:
+        st.info("Pas assez de mois renseignés pour comparer les saisons.")
+        return
+    col1, col2, col3 = st.columns(3)
+    col1.metric("🌞 Haute saison", f"{saisons['haute']:.1f} %",
+                help="Occupation moyenne sur " + ", ".join(saisons["mois_haute"]))
+    col2.metric("❄️ Basse saison", f"{saisons['basse']:.1f} %",
+                help="Occupation moyenne sur " + ", ".join(saisons["mois_basse"]))
+    col3.metric("↕️ Écart", f"{saisons['haute'] - saisons['basse']:+.1f} pts")
+    fig = cached_figure("saison_haute_basse", ctx.df,
+                        lambda df: _peak_offpeak_figure(saisons), version=ctx.version)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _peak_offpeak_figure(saisons):
+    import plotly.express as px
+    return px.bar(
+        saisons["par_quartier"].melt(id_vars="neighbourhood_cleansed",
+                                     value_vars=["haute", "basse"]),
+        x="neighbourhood_cleansed", y="value", color="variable", barmode="group",
+        labels={"neighbourhood_cleansed": "Quartier", "value": "Occupation (%)",
+                "variable": "Saison"}, title=""
+    )
@@ -0,0 +1,22 @@
+import streamlit as st
+from app.utils.export import FORMATS, available_formats, export_frame
+
+
+def render_export_button(df, colonnes, nom, key):
+    """Choix du format et bouton de téléchargement de `df`, projeté sur `colonnes`.
+
+    Le fichier n'est produit qu'au clic (génération différée), par blocs, à partir de la
+    sélection partagée. Le rappel garde une référence à `df` (sans copie) tant que
+    Streamlit conserve le bouton, jusqu'à l'exécution suivante. Au clic, Streamlit sert
+    des octets : le fichier est lu en entier et le pic de mémoire vaut la taille de l'export.
+    """
+    col1, col2 = st.columns([1, 3])
+    fmt = col1.selectbox("Format", available_formats(), key=f"{key}_format",
+                         label_visibility="collapsed")
+    mime, extension = FORMATS[fmt]
+    col2.download_button(
+        f"📥 Exporter ({len(df)} lignes)",
+        data=lambda: export_frame(df, colonnes, fmt).read(),
+        file_name=f"{nom}{extension}", mime=mime, key=f"{key}_bouton",
+        on_click="ignore", disabled=df.empty,
+    )
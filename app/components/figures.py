@@ -0,0 +1,134 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Au-delà de ce nombre de lignes, les nuages de points sont échantillonnés et les boîtes
+# à moustaches construites à partir de statistiques précalculées
+MAX_POINTS = int(os.environ.get("figure_max_points", 5000))
+CACHE_SIZE = 64
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def selection_key(df, version=None):
+    """Empreinte de la sélection : les positions des lignes retenues (index de df) et la
+    `version` du jeu de données auquel elles renvoient (attrs["version"] de load_data).
+
+    Les tables de load_data numérotent toutes leurs lignes 0..n-1 : sans `version`, deux
+    jeux de données (source mise à jour, cache vidé) partageraient les mêmes empreintes.
+    """
+    empreinte = hashlib.blake2b(df.index.to_numpy().tobytes(), digest_size=16)
+    if version is not None:
+        empreinte.update(str(version).encode())
+    return empreinte.hexdigest()
+
+
+def cached_figure(nom, df, builder, *args, version=None):
+    """Figure `builder(df, *args)` mémorisée (LRU, partagée entre sessions) par sélection
+    et version du jeu de données (voir selection_key).
+
+    Les figures sont seulement sérialisées par st.plotly_chart, jamais modifiées : la
+    même instance peut être renvoyée à plusieurs sessions.
+    """
+    key = (nom, selection_key(df, version), args)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    fig = builder(df, *args)
+    with _lock:
+        _cache[key] = fig
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return fig
+
+
+def _outliers(df, colonnes, by=None):
+    """Lignes hors des moustaches (1,5 × IQR) sur l'une des colonnes, par groupe `by`."""
+    masque = np.zeros(len(df), dtype=bool)
+    for col in colonnes:
+        valeurs = df[col]
+        groupes = valeurs.groupby([df[b] for b in by]) if by else valeurs.groupby(
+            np.zeros(len(df)))
+        q1, q3 = groupes.transform("quantile", 0.25), groupes.transform("quantile", 0.75)
+        iqr = q3 - q1
+        masque |= ((valeurs < q1 - 1.5 * iqr) | (valeurs > q3 + 1.5 * iqr)).to_numpy()
+    return masque
+
+
+def sample_points(df, colonnes, max_points=MAX_POINTS, by=None, seed=0):
+    """Échantillon d'au plus `max_points` lignes, qui conserve en priorité les valeurs
+    atypiques de `colonnes` et complète par un tirage aléatoire des autres lignes.
+    """
+    if len(df) <= max_points:
+        return df
+    masque = _outliers(df, colonnes, by)
+    atypiques, autres = df[masque], df[~masque]
+    if len(atypiques) >= max_points:
+        return atypiques.sample(n=max_points, random_state=seed).sort_index()
+    reste = autres.sample(n=max_points - len(atypiques), random_state=seed)
+    return pd.concat([atypiques, reste]).sort_index()
+
+
+def scatter_figure(df, **kwargs):
+    """px.scatter, passé en WebGL et échantillonné au-delà de MAX_POINTS lignes."""
+    import plotly.express as px
+    if len(df) <= MAX_POINTS:
+        return px.scatter(df, **kwargs)
+    colonnes = [kwargs[k] for k in ("x", "y") if k in kwargs]
+    return px.scatter(sample_points(df, colonnes), render_mode="webgl", **kwargs)
+
+
+def box_figure(df, x, y, color=None, points="all"):
+    """px.box ; au-delà de MAX_POINTS lignes, boîtes à partir des quartiles précalculés
+    et points limités à un échantillon borné qui conserve les valeurs atypiques.
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+    if len(df) <= MAX_POINTS:
+        return px.box(df, x=x, y=y, color=color, points=points)
+
+    by = [c for c in (color, x) if c]
+    groupes = df.groupby(by)[y]
+    stats = groupes.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ["q1", "median", "q3"]
+    iqr = stats["q3"] - stats["q1"]
+    bornes = df[by + [y]].join(
+        pd.DataFrame({"bas": stats["q1"] - 1.5 * iqr, "haut": stats["q3"] + 1.5 * iqr}), on=by
+    )
+    dedans = bornes[(bornes[y] >= bornes["bas"]) & (bornes[y] <= bornes["haut"])]
+    stats["lowerfence"] = dedans.groupby(by)[y].min()
+    stats["upperfence"] = dedans.groupby(by)[y].max()
+    stats = stats.reset_index()
+
+    if points == "outliers":
+        nuage = df[_outliers(df, [y], by)]
+        nuage = nuage.sample(n=min(len(nuage), MAX_POINTS), random_state=0)
+    else:
+        nuage = sample_points(df, [y], by=by)
+
+    couleurs = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    valeurs = sorted(stats[color].unique()) if color else [None]
+    for i, valeur in enumerate(valeurs):
+        s = stats[stats[color] == valeur] if color else stats
+        n = nuage[nuage[color] == valeur] if color else nuage
+        teinte = couleurs[i % len(couleurs)]
+        nom = str(valeur) if color else y
+        fig.add_trace(go.Box(
+            x=s[x], q1=s["q1"], median=s["median"], q3=s["q3"],
+            lowerfence=s["lowerfence"], upperfence=s["upperfence"],
+            name=nom, legendgroup=nom, offsetgroup=nom, marker_color=teinte, boxpoints=False,
+        ))
+        fig.add_trace(go.Scatter(
+            x=n[x], y=n[y], mode="markers", name=nom, legendgroup=nom, offsetgroup=nom,
+            showlegend=False, marker=dict(color=teinte, size=4, opacity=0.5),
+        ))
+    fig.update_layout(boxmode="group", scattermode="group", xaxis_title=x, yaxis_title=y,
+                      legend_title_text=color or "")
+    return fig
@@ -1,28 +1,141 @@
-import folium
-from folium.plugins import FastMarkerCluster
-from streamlit_folium import st_folium
+import numpy as np
+import streamlit as st
+from app.utils.filters import get_cluster_index, get_hex_grid
+from app.utils.hexgrid import ZOOM_POINTS
 
+# Échelle des prix médians de la grille de densité (RVB : bas, milieu, haut)
+PALETTE_DENSITE = np.array([[255, 243, 224], [255, 90, 95], [139, 0, 69]])
 
-def render_fast_marker_map(df, zoom=12, width=1000, height=600):
-    coords = df[["latitude", "longitude", "price", "name", "neighbourhood_cleansed"]].copy()
-    center = [coords["latitude"].mean(), coords["longitude"].mean()]
+
+def st_folium(carte, **kwargs):
+    """streamlit_folium.st_folium, importé au premier rendu d'une carte."""
+    from streamlit_folium import st_folium as rendu
+    return rendu(carte, **kwargs)
+
+
+def _view(key, default_zoom):
+    """Zoom et emprise renvoyés par st_folium au dernier déplacement de la carte."""
+    state = st.session_state.get(key) or {}
+    zoom = state.get("zoom") or default_zoom
+    bounds = state.get("bounds") or {}
+    sw, ne = bounds.get("_southWest"), bounds.get("_northEast")
+    if not sw or not ne or sw.get("lat") is None or ne.get("lat") is None:
+        return zoom, None, state.get("center")
+    return zoom, ((sw["lat"], sw["lng"]), (ne["lat"], ne["lng"])), state.get("center")
+
+
+def _features(clusters, points, df):
+    features = []
+    for c in clusters.itertuples(index=False):
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [c.longitude, c.latitude]},
+            "properties": {
+                "annonces": int(c.annonces),
+                "info": f"<b>{int(c.annonces)} logements</b><br/>~{c.prix_moyen:.0f} € en moyenne",
+            },
+        })
+    # Les lignes de df sont indexées par leur position dans le jeu de données complet
+    details = df.loc[points, ["latitude", "longitude", "price", "name", "neighbourhood_cleansed"]]
+    for p in details.itertuples(index=False):
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [p.longitude, p.latitude]},
+            "properties": {
+                "annonces": 1,
+                "info": f"<b>{p.name}</b><br/>{p.neighbourhood_cleansed}<br/>"
+                        f"<b>{p.price:.0f} €</b>",
+            },
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _density_layer(grille, cells):
+    """Hexagones colorés par prix médian, d'autant plus opaques qu'ils sont denses.
+
+    Renvoie la couche et les prix des deux extrémités de l'échelle de couleurs.
+    """
+    import folium
+    prix = cells["prix_median"].to_numpy(dtype=float)
+    bornes = np.nanpercentile(prix, [5, 95]) if np.isfinite(prix).any() else np.array([0, 1])
+    rang = np.clip((prix - bornes[0]) / max(bornes[1] - bornes[0], 1), 0, 1)
+    teintes = np.stack([np.interp(rang, [0, 0.5, 1], PALETTE_DENSITE[:, i]) for i in range(3)], 1)
+    couleurs = np.where(np.isfinite(prix), [f"#{r:02X}{g:02X}{b:02X}"
+                                            for r, g, b in np.nan_to_num(teintes).astype(int)],
+                        "#BBBBBB")
+    annonces = cells["annonces"].to_numpy()
+    opacites = 0.25 + 0.5 * np.log1p(annonces) / np.log1p(max(annonces.max(initial=0), 1))
+    # Coordonnées à une dizaine de mètres près : de quoi alléger le GeoJSON envoyé au navigateur
+    contours = np.round(grille.polygons(cells), 4).tolist()
+
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [contour]},
+            "properties": {"annonces": int(n), "prix": "-" if np.isnan(p) else f"{p:.0f} €",
+                           "dispo": f"{d:.0f} j/an", "couleur": couleur,
+                           "opacite": round(float(o), 3)},
+        }
+        for contour, n, p, d, couleur, o in zip(contours, annonces, prix,
+                                                cells["dispo_moyenne"].to_numpy(), couleurs,
+                                                opacites)
+    ]
+    couche = folium.GeoJson(
+        {"type": "FeatureCollection", "features": features},
+        style_function=lambda f: {
+            "fillColor": f["properties"]["couleur"], "fillOpacity": f["properties"]["opacite"],
+            "color": "#B0006D", "weight": 0.5, "opacity": 0.4,
+        },
+        # folium exige que les champs de l'infobulle existent : aucune sur une carte vide
+        tooltip=folium.GeoJsonTooltip(fields=["annonces", "prix", "dispo"],
+                                      aliases=["Logements", "Prix médian", "Disponibilité"],
+                                      sticky=True) if features else None,
+    )
+    return couche, bornes
+
+
+def render_fast_marker_map(df, zoom=12, width=1000, height=600, key="carte", snapshot=None):
+    """Carte des annonces de `df`, agrégées côté serveur selon le zoom et l'emprise.
+
+    En dessous de ZOOM_POINTS, une grille hexagonale de densité (annonces, prix médian,
+    disponibilité moyenne par cellule) ; au-delà, groupes et annonces individuelles.
+    Seul ce qui est visible est envoyé au navigateur ; le zoom et l'emprise renvoyés par
+    st_folium servent à affiner la vue au rerun suivant.
+    """
+    import folium
+    rows = df.index.to_numpy()
+    index = get_cluster_index(snapshot)
+    view_zoom, bounds, center = _view(key, zoom)
+
+    if center is None:
+        center = [np.nanmean(index.lat[rows]), np.nanmean(index.lon[rows])] if len(rows) else \
+            [48.8566, 2.3522]
+    else:
+        center = [center["lat"], center["lng"]]
     base_map = folium.Map(location=center, zoom_start=zoom, tiles="CartoDB positron",
                           control_scale=True)
 
-    data = coords.values.tolist()
-    callback = """
-    function(row){
-        var m = L.marker(new L.LatLng(row[0], row[1]));
-        m.bindTooltip(
-            `<b>${row[3]}</b><br/>` +
-            `${row[4]}<br/>` +
-            `<b>${row[2].toFixed(0)} €</b>`,
-            {sticky: true}
-        );
-        return m;
-    }
-    """
-    FastMarkerCluster(data=data, callback=callback).add_to(base_map)
+    if view_zoom < ZOOM_POINTS:
+        grille = get_hex_grid(snapshot)
+        couche, bornes = _density_layer(grille, grille.cells(index.visible(rows, bounds),
+                                                             view_zoom))
+        st.caption(f"Densité par hexagone : couleur du clair au foncé selon le prix médian "
+                   f"({bornes[0]:.0f} € → {bornes[1]:.0f} €), opacité selon le nombre "
+                   f"d'annonces. Zoomez pour afficher les annonces.")
+    else:
+        clusters, points = index.query(rows, view_zoom, bounds)
+        couche = folium.GeoJson(
+            _features(clusters, points, df),
+            marker=folium.CircleMarker(fill=True, fill_opacity=0.7, weight=1),
+            style_function=lambda f: {
+                "radius": 5 if f["properties"]["annonces"] == 1 else
+                8 + 3 * np.log2(f["properties"]["annonces"]),
+                "color": "#B0006D", "fillColor": "#FF5A5F",
+            },
+            tooltip=folium.GeoJsonTooltip(fields=["info"], labels=False, sticky=True),
+        )
+    couche.add_to(base_map)
 
-    map_data = st_folium(base_map, width=width, height=height)
+    map_data = st_folium(base_map, center=center, zoom=view_zoom, width=width, height=height,
+                         key=key, returned_objects=["zoom", "bounds", "center"])
     return map_data
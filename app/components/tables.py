@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from app.components.figures import selection_key
+
+TAILLE_PAGE = 12
+HAUTEUR_LIGNE = 35  # px, hauteur d'une ligne de st.dataframe
+CLASSEMENT = "Classement"  # ordre du résultat tel que calculé (score, rapport avis / prix...)
+
+
+def sort_order(df, colonne, ascendant=True):
+    """Positions des lignes de `df` triées sur `colonne` (tri stable, valeurs manquantes
+    en dernier) ; l'ordre d'origine pour CLASSEMENT."""
+    if colonne == CLASSEMENT:
+        ordre = np.arange(len(df))
+        return ordre if ascendant else ordre[::-1]
+    valeurs = pd.Series(df[colonne].to_numpy())
+    return valeurs.sort_values(ascending=ascendant, kind="stable",
+                               na_position="last").index.to_numpy()
+
+
+def _ordres(df, key, version):
+    """Ordres de tri de `df` déjà calculés, gardés côté serveur tant que `df` (le résultat
+    mémorisé de la sélection) ne change pas. La page courante n'est remise à 1 que si les
+    lignes du résultat changent, pas à chaque nouvelle exécution de la page."""
+    cache = st.session_state.get(f"{key}_ordres")
+    if cache is None or cache[0] is not df:
+        signature = selection_key(df, version)
+        if cache is None or cache[1] != signature:
+            st.session_state[f"{key}_page"] = 1
+        cache = (df, signature, {})
+        st.session_state[f"{key}_ordres"] = cache
+    return cache[2]
+
+
+def render_paginated_table(df, colonnes, key, taille=TAILLE_PAGE, version=None):
+    """Tableau paginé et triable de `df` (colonnes `colonnes`) : seule la page courante
+    est envoyée au navigateur. `version` identifie le jeu de données dont `df` est extrait
+    (ctx.version), pour reconnaître un changement de snapshot.
+
+    Les tris sont des tableaux de positions calculés une fois par colonne et par sens,
+    gardés en session : trier ou changer de page n'est qu'une lecture d'index sur le
+    résultat mémorisé. Renvoie les lignes de la page affichée.
+    """
+    ordres = _ordres(df, key, version)
+    col1, col2, col3 = st.columns([2, 1, 1])
+    colonne = col1.selectbox("Trier par", [CLASSEMENT] + list(colonnes), key=f"{key}_tri")
+    ascendant = col2.radio("Ordre", [True, False], horizontal=True, key=f"{key}_sens",
+                           format_func={True: "⬆️", False: "⬇️"}.get)
+    if (colonne, ascendant) not in ordres:
+        ordres[(colonne, ascendant)] = sort_order(df, colonne, ascendant)
+    ordre = ordres[(colonne, ascendant)]
+
+    n_pages = max(1, -(-len(df) // taille))
+    if st.session_state.get(f"{key}_page", 1) > n_pages:
+        st.session_state[f"{key}_page"] = n_pages
+    page = col3.number_input(f"Page (sur {n_pages})", min_value=1, max_value=n_pages,
+                             key=f"{key}_page")
+    debut = (page - 1) * taille
+    lignes = df.iloc[ordre[debut:debut + taille]]
+    st.dataframe(lignes[colonnes], use_container_width=True,
+                 height=HAUTEUR_LIGNE * (len(lignes) + 1) + 3)
+    st.caption(f"Lignes {debut + 1}–{debut + len(lignes)} sur {len(df)}" if len(lignes)
+               else "Aucune ligne.")
+    return lignes
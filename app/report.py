@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from app.utils import analytics
+from app.utils.anomalies import PriceAnomalies
+from app.utils.backend import DuckDBBackend, use_duckdb
+from app.utils.context import SelectionContext
+from app.utils.cube import PRIX_MAX, StatsCube
+from app.utils.index import FilterIndex
+from app.utils.load import current_snapshot, load_artifact, read_listings, read_seasonality
+from app.utils.pricing import PriceModel
+from app.utils.seasonality import SeasonalIndex
+
+# Données chargées une fois par processus de travail (voir _init_worker)
+_worker = {}
+
+
+def slug(texte):
+    texte = unicodedata.normalize("NFKD", str(texte)).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", texte.lower()).strip("-")
+
+
+def _init_worker(path):
+    df = read_listings(path)
+    if use_duckdb():
+        index = cube = DuckDBBackend(path)
+    else:
+        index, cube = load_artifact("filtres"), load_artifact("cube")
+    anomalies = load_artifact("anomalies")
+    modele_prix = load_artifact("prix")
+    saison = read_seasonality(path)
+    _worker.update(
+        df=df, saison=SeasonalIndex(df, saison) if saison is not None else None,
+        index=index if index is not None else FilterIndex(df),
+        cube=cube if cube is not None else StatsCube(df),
+        anomalies=anomalies if anomalies is not None else PriceAnomalies(df),
+        modele_prix=modele_prix if modele_prix is not None else PriceModel(df),
+    )
+
+
+def report(quartier, room_type, prix_range, out):
+    """Écrit le rapport d'un (quartier, type de logement) dans `out` ; renvoie ses KPIs."""
+    ctx = SelectionContext.from_selection(
+        _worker["df"], [quartier], [room_type], prix_range, _worker["index"],
+        cube=_worker["cube"], saison=_worker["saison"], anomalies=_worker["anomalies"],
+        modele_prix=_worker["modele_prix"]
+    )
+    dossier = os.path.join(out, slug(quartier), slug(room_type))
+    os.makedirs(dossier, exist_ok=True)
+
+    kpis = {"quartier": quartier, "room_type": room_type, **analytics.kpis(ctx)}
+    with open(os.path.join(dossier, "kpis.json"), "w") as f:
+        json.dump(kpis, f, ensure_ascii=False, indent=2, default=float)
+    if len(ctx):
+        analytics.recommendations(ctx).to_csv(
+            os.path.join(dossier, "recommandations.csv"), index=False)
+        analytics.bons_plans(ctx)[analytics.COLONNES_BONS_PLANS].to_csv(
+            os.path.join(dossier, "bons_plans.csv"), index=False)
+        analytics.price_outliers(ctx, sens="deux").to_csv(
+            os.path.join(dossier, "tarifs_atypiques.csv"), index=False)
+        saison = analytics.seasonality(ctx)
+        if saison is not None:
+            saison.to_csv(os.path.join(dossier, "saisonnalite.csv"), index=False)
+    return kpis
+
+
+def _report(args):
+    return report(*args)
+
+
+def build_reports(out, prix_range=(0, PRIX_MAX), workers=None):
+    """Rapports de tous les (quartier, type de logement) du jeu de données courant,
+    répartis sur un pool de processus, et un index.csv récapitulant leurs KPIs.
+    """
+    path = current_snapshot()
+    df = read_listings(path)
+    combinaisons = [
+        (q, t, prix_range, out)
+        for q in sorted(df["neighbourhood_cleansed"].dropna().unique())
+        for t in sorted(df["room_type"].dropna().unique())
+    ]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(path,)) as pool:
+        kpis = list(pool.map(_report, combinaisons, chunksize=4))
+
+    index = pd.DataFrame(kpis)
+    index.to_csv(os.path.join(out, "index.csv"), index=False)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rapports statiques par quartier et type.")
+    parser.add_argument("--out", default="reports", help="dossier de sortie")
+    parser.add_argument("--prix", type=float, nargs=2, default=(0, PRIX_MAX),
+                        metavar=("MIN", "MAX"), help="plage de prix retenue")
+    parser.add_argument("--workers", type=int, help="processus (défaut : nombre de cœurs)")
+    args = parser.parse_args(argv)
+
+    debut = time.perf_counter()
+    index = build_reports(args.out, tuple(args.prix), args.workers)
+    print(f"{len(index)} rapports écrits dans {args.out} en {time.perf_counter() - debut:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
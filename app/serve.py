@@ -0,0 +1,23 @@
+import os
+import sys
+
+from streamlit.web import cli
+from app.utils.warmup import start_warmup
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main(argv=None):
+    """`streamlit run Home.py [options]`, avec le préchargement lancé dès le démarrage du
+    serveur : le premier visiteur trouve les données et index déjà construits.
+
+    Les options sont celles de streamlit run (--server.port, --server.address...).
+    """
+    start_warmup()
+    options = sys.argv[1:] if argv is None else argv
+    sys.argv = ["streamlit", "run", os.path.join(RACINE, "Home.py"), *options]
+    cli.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import numpy as np
+import pandas as pd
+from app.utils.anomalies import PriceAnomalies
+from app.utils.ranking import score_qualite_prix, top_k, top_k_positions
+
+# Calculs des pages, sans Streamlit : chaque fonction prend un SelectionContext et renvoie
+# des données (dict ou DataFrame) que les composants de app/components/charts.py affichent
+# et que app/report.py exporte.
+
+COLONNES_RECO = ["name", "neighbourhood_cleansed", "price", "availability_365",
+                 "number_of_reviews", "listing_url"]
+COLONNES_BONS_PLANS = ["name", "neighbourhood_cleansed", "price", "availability_365",
+                       "number_of_reviews"]
+COLONNES_ATYPIQUES = ["name", "neighbourhood_cleansed", "room_type", "price", "prix_median",
+                      "score"]
+COLONNES_COMPARABLES = ["name", "neighbourhood_cleansed", "price", "number_of_reviews",
+                        "availability_365", "distance_km"]
+MAX_RESULTATS_RECHERCHE = 50  # annonces proposées au plus par search_listings
+# Saisonnalité : mois de la moyenne glissante, mois de haute et de basse saison
+FENETRE_TENDANCE = 3
+MOIS_SAISON = 3
+
+
+def detect_bons_plans(df, medianes=None):
+    """Annonces moins chères que la médiane, mieux notées et plus disponibles.
+
+    `medianes` permet de réutiliser des médianes déjà calculées (colonne -> valeur).
+    """
+    if medianes is None:
+        medianes = {col: df[col].median()
+                    for col in ("price", "number_of_reviews", "availability_365")}
+        if "total_booked_6m" in df:
+            medianes["total_booked_6m"] = df["total_booked_6m"].median()
+    prix_med = medianes["price"]
+    reviews_med = medianes["number_of_reviews"]
+    dispo_med = medianes["availability_365"]
+    recent_booking = medianes.get("total_booked_6m", 0)
+
+    return df[
+        (df["price"] <= prix_med) &
+        (df["number_of_reviews"] >= reviews_med) &
+        (df["availability_365"] >= dispo_med) &
+        (df.get("total_booked_6m", 0) >= recent_booking)
+    ]
+
+
+def kpis(ctx):
+    """Indicateurs clés de la sélection."""
+    total = ctx.total
+    nb_annonces = len(ctx)
+    return {
+        "annonces": nb_annonces,
+        "prix_moyen": total["prix_moyen"],
+        "prix_median": total["prix_median"],
+        "prix_median_global": ctx.prix_median_global,
+        "ecart_mediane_paris": total["prix_moyen"] - ctx.prix_median_global,
+        "reviews_moyen": total["reviews_moyen"],
+        "dispo_moyenne": total["dispo_moyenne"],
+        "taux_bons_plans": 100 * len(ctx.bons_plans) / nb_annonces if nb_annonces else 0,
+    }
+
+
+def group_stats(ctx):
+    """Statistiques par quartier de la sélection (effectifs, prix, avis, disponibilité)."""
+    return ctx.par_quartier
+
+
+def recommendations(ctx):
+    """Annonces à revoir, du plus faible rapport avis / prix au plus élevé.
+
+    Avec un modèle de prix (ctx.modele_prix), le prix suggéré, son intervalle et l'écart
+    du prix actuel au prix suggéré sont ajoutés, lus dans les prédictions précalculées.
+    """
+    a_revoir = top_k(ctx.a_revoir, "qualite_prix", ascending=True)
+    if ctx.modele_prix is None:
+        return a_revoir[COLONNES_RECO]
+    suggestions = ctx.modele_prix.suggestions(a_revoir.index.to_numpy(), a_revoir["price"])
+    return pd.concat([a_revoir[COLONNES_RECO[:3]], suggestions, a_revoir[COLONNES_RECO[3:]]],
+                     axis=1)
+
+
+def bons_plans(ctx):
+    """Bons plans de la sélection, classés par score composite décroissant."""
+    return top_k(ctx.bons_plans, "bon_plan")
+
+
+def price_outliers(ctx, seuil=2, sens="haut", methode="robuste"):
+    """Annonces de la sélection dont le prix est atypique dans leur (quartier, type) à
+    l'échelle de Paris, les plus éloignées d'abord.
+
+    `sens` : `haut` (surtarifées), `bas` (sous-tarifées) ou `deux` ; `methode` : `robuste`
+    (médiane / MAD) ou `zscore` (moyenne / écart-type). Les scores sont précalculés sur
+    tout le jeu de données (ctx.anomalies) et simplement lus pour les lignes retenues.
+    """
+    if ctx.anomalies is not None:
+        anomalies, rows = ctx.anomalies, ctx.rows
+    elif ctx.df_global is not None:
+        anomalies, rows = PriceAnomalies(ctx.df_global), ctx.rows
+    else:
+        anomalies, rows = PriceAnomalies(ctx.df), np.arange(len(ctx))
+    positions = anomalies.outliers(rows, seuil, sens, methode)
+    suspects = ctx.df.iloc[positions].assign(
+        prix_median=anomalies.mediane[rows[positions]],
+        score=anomalies.scores(rows[positions], methode),
+    )
+    return top_k(suspects, np.abs(suspects["score"].to_numpy()))[COLONNES_ATYPIQUES]
+
+
+def comparables(ctx, voisins, lat, lon, room_type, k=10, rayon_km=1.0, exclure=None):
+    """Les `k` annonces de type `room_type` les plus proches de (lat, lon) dans tout Paris,
+    dans un rayon de `rayon_km`, avec leur distance (NeighborIndex `voisins` de df_global).
+    """
+    positions, distances = voisins.nearest(lat, lon, room_type, k, rayon_km, exclure)
+    proches = ctx.df_global.iloc[positions].assign(distance_km=distances.round(3))
+    return proches[COLONNES_COMPARABLES]
+
+
+def search_listings(ctx, texte, limite=MAX_RESULTATS_RECHERCHE):
+    """(positions, nombre de correspondances) des annonces de la sélection dont le nom
+    contient `texte` (sans casse) ou dont l'id vaut `texte` ; au plus `limite` positions,
+    dans l'ordre de la sélection."""
+    df = ctx.df
+    texte = texte.strip()
+    if texte:
+        masque = df["name"].str.contains(texte, case=False, regex=False, na=False)
+        if texte.isdigit():
+            masque |= df["id"] == int(texte)
+        df = df[masque]
+    return df.index.to_numpy()[:limite], len(df)
+
+
+def price_distribution(df):
+    """Résumé des prix de `df` : effectif, minimum, quartiles et maximum."""
+    prix = df["price"].dropna()
+    return {
+        "annonces": len(prix),
+        "min": prix.min(),
+        "q1": prix.quantile(0.25),
+        "median": prix.median(),
+        "q3": prix.quantile(0.75),
+        "max": prix.max(),
+    }
+
+
+def room_type_counts(ctx):
+    counts = ctx.df["room_type"].value_counts().reset_index()
+    counts.columns = ["room_type", "count"]
+    return counts
+
+
+def top_deals(ctx, k=3):
+    """Score qualité/prix moyen des `k` meilleures annonces de chaque quartier."""
+    df = ctx.df[ctx.df["price"] > 0]
+    scores = score_qualite_prix(df)
+
+    # k meilleurs scores par quartier, par sélection partielle (sans tri complet des groupes)
+    top = top_k_positions(df, scores, k=k, by="neighbourhood_cleansed")
+    top_deals = pd.DataFrame({
+        "neighbourhood_cleansed": df["neighbourhood_cleansed"].iloc[top].to_numpy(),
+        "score_qp": scores[top],
+    })
+    summary = top_deals.groupby("neighbourhood_cleansed")["score_qp"].mean().reset_index()
+    return summary.sort_values("score_qp", ascending=False)
+
+
+def _occupation(sommes, effectifs, jours):
+    """Taux d'occupation estimé (%) : part des jours du mois où les annonces ne sont pas
+    disponibles à la réservation (NaN sans donnée)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100 * (1 - sommes / (effectifs * jours))
+
+
+def seasonality(ctx):
+    """Jours disponibles moyens et occupation estimée par mois (format YYYY-MM), ou None
+    sans saisonnalité."""
+    saison = ctx.saison_selection
+    if saison is None:
+        return None
+    sommes, nb = saison.total()
+    return pd.DataFrame({
+        "month": saison.mois,
+        "nb_jours_dispos": sommes / np.maximum(nb, 1),
+        "occupation": _occupation(sommes, nb, saison.jours),
+    })[nb > 0]
+
+
+def seasonality_matrix(ctx, axe="quartier"):
+    """Occupation estimée (%) par quartier (ou par type de logement) et par mois."""
+    saison = ctx.saison_selection
+    if saison is None:
+        return None
+    libelles, sommes, nb = saison.par(axe)
+    return pd.DataFrame(_occupation(sommes, nb, saison.jours), index=libelles,
+                        columns=saison.mois)
+
+
+def seasonality_trend(ctx, fenetre=FENETRE_TENDANCE):
+    """Occupation mensuelle et sa moyenne glissante centrée sur `fenetre` mois."""
+    mensuel = seasonality(ctx)
+    if mensuel is None:
+        return None
+    return mensuel.assign(
+        tendance=mensuel["occupation"].rolling(fenetre, center=True, min_periods=1).mean())
+
+
+def peak_offpeak(ctx, n=MOIS_SAISON):
+    """Haute et basse saison de la sélection (les `n` mois les plus et les moins occupés)
+    et l'occupation de chaque quartier sur ces deux périodes."""
+    saison = ctx.saison_selection
+    if saison is None:
+        return None
+    sommes, nb = saison.total()
+    occupation = _occupation(sommes, nb, saison.jours)
+    mois = np.flatnonzero(nb > 0)
+    if len(mois) < 2:
+        return None
+    n = min(n, len(mois) // 2)
+    rangs = mois[np.argsort(occupation[mois], kind="stable")]
+    haute, basse = np.sort(rangs[-n:]), np.sort(rangs[:n])
+
+    libelles, sommes_q, nb_q = saison.par("quartier")
+
+    def periode(colonnes):
+        return _occupation(sommes_q[:, colonnes].sum(axis=1),
+                           1, (nb_q[:, colonnes] * saison.jours[colonnes]).sum(axis=1))
+
+    par_quartier = pd.DataFrame({
+        "neighbourhood_cleansed": libelles, "haute": periode(haute), "basse": periode(basse),
+    }).assign(ecart=lambda d: d["haute"] - d["basse"]).sort_values("ecart", ascending=False)
+    return {
+        "mois_haute": saison.mois[haute].tolist(), "mois_basse": saison.mois[basse].tolist(),
+        "haute": float(_occupation(sommes[haute].sum(), 1, (nb * saison.jours)[haute].sum())),
+        "basse": float(_occupation(sommes[basse].sum(), 1, (nb * saison.jours)[basse].sum())),
+        "par_quartier": par_quartier,
+    }
+
+
+def price_evolution(ctx, evolution):
+    """Évolution des prix médians entre snapshots, limitée aux quartiers sélectionnés."""
+    quartiers = ctx.df["neighbourhood_cleansed"].unique()
+    return evolution[evolution["neighbourhood_cleansed"].isin(quartiers)]
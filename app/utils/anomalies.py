@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# Facteurs de cohérence avec l'écart-type d'une loi normale
+K_MAD = 1.4826
+K_ECART_MOYEN = 1.2533
+# En dessous de cet effectif, un groupe (quartier, type) n'a pas de score
+EFFECTIF_MIN = 5
+METHODES = ("robuste", "zscore")
+
+
+class PriceAnomalies:
+    """Scores d'anomalie de prix de chaque annonce dans son groupe (quartier, type).
+
+    Calculés une fois par jeu de données, sur toute la ville, par transformations de
+    groupe (sans jointure) : score robuste (écart à la médiane en MAD normalisées, ou en
+    écarts absolus moyens si la MAD est nulle) et z-score classique. Les tableaux sont
+    alignés sur les lignes du jeu de données : une sélection y lit ses lignes.
+    """
+
+    def __init__(self, df):
+        groupes, _ = pd.factorize(
+            pd.MultiIndex.from_arrays([df["neighbourhood_cleansed"], df["room_type"]])
+        )
+        prix = df["price"].astype(float).reset_index(drop=True)
+        par_groupe = prix.groupby(groupes)
+
+        effectif = par_groupe.transform("count").to_numpy()
+        mediane = par_groupe.transform("median").to_numpy()
+        ecarts = (prix - mediane).abs().groupby(groupes)
+        echelle = K_MAD * ecarts.transform("median").to_numpy()
+        echelle = np.where(echelle > 0, echelle, K_ECART_MOYEN * ecarts.transform("mean").to_numpy())
+        moyenne = par_groupe.transform("mean").to_numpy()
+        ecart_type = par_groupe.transform("std").to_numpy()
+
+        valides = (effectif >= EFFECTIF_MIN) & (groupes >= 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.robuste = np.where(valides & (echelle > 0), (prix - mediane) / echelle, np.nan)
+            self.zscore = np.where(valides & (ecart_type > 0),
+                                   (prix - moyenne) / ecart_type, np.nan)
+        self.mediane = mediane
+
+    def scores(self, rows, methode="robuste"):
+        """Scores des lignes `rows` (positions dans le jeu de données)."""
+        if methode not in METHODES:
+            raise ValueError(f"Méthode inconnue : {methode} (attendu : {', '.join(METHODES)})")
+        return getattr(self, methode)[rows]
+
+    def outliers(self, rows, seuil=2.0, sens="haut", methode="robuste"):
+        """Positions (parmi `rows`) des annonces au-delà de `seuil` : trop chères (`haut`),
+        trop bon marché (`bas`) ou les deux (`deux`)."""
+        scores = self.scores(rows, methode)
+        if sens == "haut":
+            masque = scores > seuil
+        elif sens == "bas":
+            masque = scores < -seuil
+        elif sens == "deux":
+            masque = np.abs(scores) > seuil
+        else:
+            raise ValueError(f"Sens inconnu : {sens} (attendu : haut, bas ou deux)")
+        return np.flatnonzero(masque)
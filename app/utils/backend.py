@@ -0,0 +1,138 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from app.utils.cube import BINS_DISPO, BINS_REVIEWS, _quantile_bins
+
+try:
+    import duckdb
+except ImportError:  # moteur DuckDB optionnel
+    duckdb = None
+
+BACKENDS = ("pandas", "duckdb")
+ANALYTICS_BACKEND = os.environ.get("analytics_backend", "pandas")
+
+
+def _bin(col, edges):
+    """Numéro du bin de `col` dans `edges`, comme dans StatsCube (valeur manquante : 0)."""
+    valeur = f"coalesce({col}, 0)"
+    cas = " ".join(f"WHEN {valeur} < {edges[i + 1]:g} THEN {i}" for i in range(len(edges) - 2))
+    return f"CASE {cas} ELSE {len(edges) - 2} END"
+
+
+# Agrégats d'une sélection, calculés comme StatsCube : moyennes et quantiles de prix exacts
+# (prix entiers), médianes des reviews et de la disponibilité tirées des mêmes histogrammes
+AGREGATS = f"""
+    count(*) AS annonces,
+    avg(price) AS prix_moyen,
+    quantile_cont(price, 0.5) AS prix_median,
+    stddev_samp(price) AS prix_std,
+    quantile_cont(price, 0.25) AS prix_q1,
+    quantile_cont(price, 0.75) AS prix_q3,
+    avg(coalesce(number_of_reviews, 0)) AS reviews_moyen,
+    histogram({_bin("number_of_reviews", BINS_REVIEWS)}) AS reviews_median,
+    avg(coalesce(availability_365, 0)) AS dispo_moyenne,
+    histogram({_bin("availability_365", BINS_DISPO)}) AS dispo_median
+"""
+HISTOGRAMMES = {"reviews_median": BINS_REVIEWS, "dispo_median": BINS_DISPO}
+
+
+def use_duckdb():
+    """Vrai si analytics_backend=duckdb ; erreur si la valeur est inconnue."""
+    if ANALYTICS_BACKEND not in BACKENDS:
+        raise ValueError(f"analytics_backend inconnu : {ANALYTICS_BACKEND} "
+                         f"(attendu : {', '.join(BACKENDS)})")
+    return ANALYTICS_BACKEND == "duckdb"
+
+
+def _filtre(quartiers, types, prix_range):
+    """Clause WHERE et paramètres de la sélection (listes IN explicites, poussées jusqu'au
+    parcours du Parquet)."""
+    clauses, params = [], []
+    for col, valeurs in (("neighbourhood_cleansed", list(quartiers)), ("room_type", list(types))):
+        if not valeurs:
+            return "FALSE", []
+        clauses.append(f"{col} IN ({', '.join('?' * len(valeurs))})")
+        params += valeurs
+    clauses.append("price BETWEEN ? AND ?")
+    params += [float(prix_range[0]), float(prix_range[1])]
+    return " AND ".join(clauses), params
+
+
+class DuckDBBackend:
+    """Filtrage et agrégations exécutés par DuckDB, en processus et sur plusieurs cœurs.
+
+    `source` est un dossier de snapshot (son listings.parquet est interrogé directement,
+    filtres poussés jusqu'au parcours des fichiers) ou un DataFrame (snapshot passé de
+    l'entrepôt, copié dans une table DuckDB). La colonne `ligne` porte la position de
+    chaque annonce dans load_data. Même interface que FilterIndex (select) et StatsCube
+    (query) : les pages l'utilisent à leur place quand analytics_backend=duckdb.
+    """
+
+    def __init__(self, source):
+        if duckdb is None:
+            raise ImportError("Le moteur DuckDB nécessite duckdb (pip install duckdb)")
+        self._con = duckdb.connect()
+        if isinstance(source, pd.DataFrame):
+            table = pa.Table.from_pandas(source, preserve_index=False)
+            table = table.append_column("ligne", pa.array(np.arange(len(source))))
+            self._con.register("source", table)
+            self._con.execute("CREATE TABLE annonces AS SELECT * FROM source")
+            self._con.unregister("source")
+        else:
+            path = os.path.join(source, "listings.parquet").replace("'", "''")
+            self._con.execute(
+                "CREATE VIEW annonces AS SELECT * EXCLUDE (file_row_number), "
+                f"file_row_number AS ligne FROM read_parquet('{path}', file_row_number = true)"
+            )
+        self.prix_median_global = self._con.execute(
+            "SELECT quantile_cont(price, 0.5) FROM annonces WHERE NOT isnan(price)"
+        ).fetchone()[0]
+
+    def _execute(self, sql, params):
+        # Un curseur par requête : les sessions Streamlit interrogent le moteur en parallèle
+        return self._con.cursor().execute(sql, params)
+
+    def select(self, quartiers, types, prix_range):
+        """Positions (croissantes) des annonces de la sélection."""
+        where, params = _filtre(quartiers, types, prix_range)
+        lignes = self._execute(f"SELECT ligne FROM annonces WHERE {where} ORDER BY ligne",
+                               params).fetchnumpy()["ligne"]
+        return np.asarray(lignes, dtype=np.int64)
+
+    def query(self, quartiers, types, prix_range):
+        """Agrégats par quartier et total de la sélection, en une seule requête."""
+        where, params = _filtre(quartiers, types, prix_range)
+        agregats = self._execute(
+            f"SELECT neighbourhood_cleansed, GROUPING(neighbourhood_cleansed) AS total, "
+            f"{AGREGATS} FROM annonces WHERE {where} "
+            "GROUP BY GROUPING SETS ((neighbourhood_cleansed), ()) "
+            "ORDER BY neighbourhood_cleansed", params
+        ).df()
+        return QuerySelection(agregats, self.prix_median_global)
+
+
+def _mediane(histo, edges):
+    """Médiane approchée d'un histogramme {bin: effectif}, comme CubeSelection."""
+    if not isinstance(histo, dict):  # sélection vide
+        return np.nan
+    dense = np.zeros(len(edges) - 1, dtype=np.int64)
+    dense[list(histo)] = list(histo.values())
+    return _quantile_bins(dense, edges, 0.5)
+
+
+class QuerySelection:
+    """Agrégats d'une sélection calculés par DuckDB ; mêmes attributs et mêmes valeurs que
+    CubeSelection."""
+
+    def __init__(self, agregats, prix_median_global):
+        for col, edges in HISTOGRAMMES.items():
+            agregats[col] = [_mediane(h, edges) for h in agregats[col]]
+        total = agregats.pop("total").to_numpy() == 1
+        self.par_quartier = agregats[~total].reset_index(drop=True)
+        ligne = agregats[total].drop(columns="neighbourhood_cleansed")
+        self.total = (ligne.iloc[0].to_dict() if len(ligne)
+                      else {col: 0 if col == "annonces" else np.nan for col in ligne.columns})
+        self.total["annonces"] = int(self.total["annonces"])
+        self.prix_median_global = prix_median_global
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+ZOOM_MIN, ZOOM_MAX = 8, 17  # au-delà de ZOOM_MAX, les annonces sont affichées une à une
+TAILLE_CELLULE = 64         # côté d'une cellule de regroupement, en pixels écran
+
+
+def _pixels(lat, lon):
+    """Coordonnées Web Mercator en pixels au niveau de zoom 0 (tuile de 256 px)."""
+    lat = np.radians(np.clip(lat, -85.05, 85.05))
+    x = (lon + 180.0) / 360.0 * 256.0
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0 * 256.0
+    return x, y
+
+
+class ClusterIndex:
+    """Regroupement hiérarchique des annonces sur une grille en pixels écran.
+
+    Chaque annonce reçoit une fois pour toutes sa cellule au zoom maximal ; la cellule à un
+    zoom inférieur s'obtient par décalage de bits (les cellules s'emboîtent d'un zoom à
+    l'autre). Une requête ne regroupe que les lignes de la sélection visibles dans
+    l'emprise courante de la carte.
+    """
+
+    def __init__(self, df):
+        self.lat = df["latitude"].to_numpy(dtype=float)
+        self.lon = df["longitude"].to_numpy(dtype=float)
+        self.prix = df["price"].to_numpy(dtype=float)
+        self._valides = np.isfinite(self.lat) & np.isfinite(self.lon)
+        x, y = _pixels(np.nan_to_num(self.lat), np.nan_to_num(self.lon))
+        self._cx = (x * 2 ** ZOOM_MAX // TAILLE_CELLULE).astype(np.int64)
+        self._cy = (y * 2 ** ZOOM_MAX // TAILLE_CELLULE).astype(np.int64)
+
+    def visible(self, rows, bounds=None, marge=0.2):
+        """Lignes de `rows` dans l'emprise `bounds` ((sud, ouest), (nord, est)) élargie."""
+        rows = rows[self._valides[rows]]
+        if bounds is None:
+            return rows
+        (sud, ouest), (nord, est) = bounds
+        d_lat, d_lon = (nord - sud) * marge, (est - ouest) * marge
+        lat, lon = self.lat[rows], self.lon[rows]
+        dedans = ((lat >= sud - d_lat) & (lat <= nord + d_lat) &
+                  (lon >= ouest - d_lon) & (lon <= est + d_lon))
+        return rows[dedans]
+
+    def query(self, rows, zoom, bounds=None):
+        """Regroupe les lignes visibles au `zoom` donné.
+
+        Renvoie (clusters, points) : un DataFrame des groupes d'au moins deux annonces
+        (latitude, longitude, annonces, prix_moyen) et les positions des annonces isolées.
+        """
+        rows = self.visible(rows, bounds)
+        if zoom > ZOOM_MAX or len(rows) == 0:
+            return pd.DataFrame(columns=["latitude", "longitude", "annonces", "prix_moyen"]), rows
+
+        decalage = ZOOM_MAX - max(int(zoom), ZOOM_MIN)
+        cle = (self._cx[rows] >> decalage) << 32 | (self._cy[rows] >> decalage)
+        _, groupe, effectif = np.unique(cle, return_inverse=True, return_counts=True)
+
+        seuls = effectif[groupe] == 1
+        multiples = effectif > 1
+        prix = np.nan_to_num(self.prix[rows])
+        clusters = pd.DataFrame({
+            "latitude": np.bincount(groupe, weights=self.lat[rows])[multiples],
+            "longitude": np.bincount(groupe, weights=self.lon[rows])[multiples],
+            "annonces": effectif[multiples],
+            "prix_moyen": np.bincount(groupe, weights=prix)[multiples],
+        })
+        clusters[["latitude", "longitude", "prix_moyen"]] = (
+            clusters[["latitude", "longitude", "prix_moyen"]].div(clusters["annonces"], axis=0)
+        )
+        return clusters, rows[seuls]
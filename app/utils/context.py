@@ -0,0 +1,114 @@
+from functools import cached_property
+
+from app.utils.analytics import detect_bons_plans
+from app.utils.cube import neighbourhood_stats
+
+
+class SelectionContext:
+    """Sélection courante d'une page et ses grandeurs dérivées.
+
+    Créé une fois par exécution de la page, juste après apply_filters, puis passé à
+    chaque graphique et tableau : médianes, quantiles, statistiques par quartier, bons
+    plans, recommandations et saisonnalité ne sont calculés qu'au premier accès.
+    """
+
+    def __init__(self, df, df_global=None, stats=None, saison=None, anomalies=None,
+                 modele_prix=None):
+        self.df = df                # annonces filtrées (index = positions dans df_global)
+        self.df_global = df_global  # jeu de données complet
+        self.stats = stats          # CubeSelection de la même sélection, si disponible
+        self.saison = saison        # SeasonalIndex aligné sur df_global, si disponible
+        self.anomalies = anomalies  # PriceAnomalies de df_global, si disponible
+        self.modele_prix = modele_prix  # PriceModel entraîné sur df_global, si disponible
+        self._quantiles = {}
+        self._resultats = {}
+
+    @classmethod
+    def from_selection(cls, df, quartiers, types, prix_range, index, cube=None, saison=None,
+                       anomalies=None, modele_prix=None):
+        """Contexte d'une sélection résolue par un FilterIndex (et un StatsCube) sur `df`,
+        sans passer par les pages : utilisé par les exports et rapports.
+        """
+        stats = cube.query(quartiers, types, prix_range) if cube is not None else None
+        return cls(df.take(index.select(quartiers, types, prix_range)), df, stats=stats,
+                   saison=saison, anomalies=anomalies, modele_prix=modele_prix)
+
+    @property
+    def version(self):
+        """Identifiant stable du jeu de données complet (attrs["version"] de load_data)."""
+        return self.df_global.attrs.get("version") if self.df_global is not None else None
+
+    @property
+    def rows(self):
+        return self.df.index.to_numpy()
+
+    def __len__(self):
+        return len(self.df)
+
+    def quantile(self, col, q):
+        key = (col, q)
+        if key not in self._quantiles:
+            self._quantiles[key] = self.df[col].quantile(q)
+        return self._quantiles[key]
+
+    def resultat(self, calcul, *args):
+        """`calcul(self, *args)` mémorisé pour la sélection : les tableaux paginés relisent
+        le même résultat à chaque changement de page ou de tri."""
+        key = (calcul, args)
+        if key not in self._resultats:
+            self._resultats[key] = calcul(self, *args)
+        return self._resultats[key]
+
+    def median(self, col):
+        return self.quantile(col, 0.5)
+
+    @cached_property
+    def medianes(self):
+        cols = ["price", "number_of_reviews", "availability_365"]
+        if "total_booked_6m" in self.df:
+            cols.append("total_booked_6m")
+        return {col: self.median(col) for col in cols}
+
+    @cached_property
+    def total(self):
+        if self.stats is not None:
+            return self.stats.total
+        return {
+            "annonces": len(self.df),
+            "prix_moyen": self.df["price"].mean(),
+            "prix_median": self.median("price"),
+            "reviews_moyen": self.df["number_of_reviews"].mean(),
+            "dispo_moyenne": self.df["availability_365"].mean(),
+        }
+
+    @cached_property
+    def prix_median_global(self):
+        if self.stats is not None:
+            return self.stats.prix_median_global
+        return self.df_global["price"].median()
+
+    @cached_property
+    def par_quartier(self):
+        return self.stats.par_quartier if self.stats is not None else neighbourhood_stats(self.df)
+
+    @cached_property
+    def saison_selection(self):
+        """Jours disponibles par (quartier, type) et par mois : une réduction pour toutes
+        les vues de saisonnalité."""
+        return self.saison.query(self.rows) if self.saison is not None else None
+
+    @cached_property
+    def bons_plans(self):
+        return detect_bons_plans(self.df, self.medianes)
+
+    @cached_property
+    def a_revoir(self):
+        """Annonces au-dessus du 3e quartile de prix mais peu commentées ou peu disponibles."""
+        df = self.df
+        return df[
+            (df["price"] > self.quantile("price", 0.75)) &
+            (
+                (df["number_of_reviews"] < self.median("number_of_reviews")) |
+                (df["availability_365"] < self.median("availability_365"))
+            )
+        ]
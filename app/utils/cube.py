@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+from app.utils.index import encode, lookup
+
+PRIX_MAX = 1000  # borne haute du curseur de prix ; au-delà, un seul compartiment
+
+# Histogrammes d'approximation des quantiles : l'erreur est bornée par la largeur du bin
+BINS_DISPO = np.arange(0, 366 + 15, 15)  # 15 jours
+BINS_REVIEWS = np.array([0, 1, 2, 3, 5, 8, 13, 20, 30, 50, 80, 130, 200, 300, 500, 800, 1300,
+                         2000, np.inf])
+
+METRIQUES = {"prix": "price", "reviews": "number_of_reviews", "dispo": "availability_365"}
+
+
+def neighbourhood_stats(df):
+    """Statistiques par quartier calculées directement sur `df` (chemin pandas)."""
+    return (
+        df.groupby("neighbourhood_cleansed")
+        .agg(annonces=("id", "count"),
+             prix_moyen=("price", "mean"), prix_median=("price", "median"),
+             prix_std=("price", "std"),
+             reviews_moyen=("number_of_reviews", "mean"),
+             dispo_moyenne=("availability_365", "mean"))
+        .reset_index()
+    )
+
+
+def _quantile_prix(histo, q):
+    """Quantile (interpolation linéaire, comme pandas) à partir d'un histogramme à pas de 1 €.
+
+    Exact pour des prix entiers, à 1 € près sinon.
+    """
+    n = histo.sum()
+    if n == 0:
+        return np.nan
+    cumul = np.cumsum(histo)
+    pos = q * (n - 1)
+    bas, haut = int(np.floor(pos)), int(np.ceil(pos))
+    v_bas = np.searchsorted(cumul, bas, side="right")
+    v_haut = np.searchsorted(cumul, haut, side="right")
+    return v_bas + (v_haut - v_bas) * (pos - bas)
+
+
+def _quantile_bins(histo, edges, q):
+    """Quantile approché : chaque rang est placé uniformément dans son bin, puis les deux
+    rangs encadrants sont interpolés comme pour pandas. Erreur < largeur du bin concerné.
+    """
+    n = histo.sum()
+    if n == 0:
+        return np.nan
+    cumul = np.cumsum(histo)
+
+    def valeur(rang):
+        i = int(np.searchsorted(cumul, rang, side="right"))
+        avant = cumul[i - 1] if i > 0 else 0
+        haut = edges[i + 1] if np.isfinite(edges[i + 1]) else edges[i]
+        return edges[i] + (haut - edges[i]) * (rang - avant + 0.5) / histo[i]
+
+    pos = q * (n - 1)
+    bas, haut = int(np.floor(pos)), int(np.ceil(pos))
+    return valeur(bas) + (valeur(haut) - valeur(bas)) * (pos - bas)
+
+
+class StatsCube:
+    """Statistiques suffisantes précalculées par (quartier, type de logement, prix à 1 €).
+
+    Pour chaque cellule : effectif, sommes et sommes des carrés du prix, des reviews et de
+    la disponibilité, plus des histogrammes des reviews et de la disponibilité. Les
+    cellules sont cumulées le long de l'axe des prix : une sélection
+    (quartiers, types, plage de prix) se résout par deux lectures et une somme sur
+    quelques cellules. Moyennes et écarts-types sont exacts ; les quantiles de prix sont
+    exacts pour des prix entiers, ceux des reviews et de la disponibilité sont approchés
+    à la largeur d'un bin près (15 jours, et BINS_REVIEWS).
+    """
+
+    def __init__(self, df):
+        self.quartiers, code_q = encode(df["neighbourhood_cleansed"])
+        self.types, code_t = encode(df["room_type"])
+        prix = df["price"].to_numpy(dtype=float)
+        ok = np.isfinite(prix) & (prix >= 0)
+        bucket = np.minimum(np.floor(prix[ok]), PRIX_MAX + 1).astype(np.int64)
+
+        forme = (len(self.quartiers) + 1, len(self.types) + 1, PRIX_MAX + 2)
+        cellule = np.ravel_multi_index((code_q[ok], code_t[ok], bucket), forme)
+        taille = int(np.prod(forme))
+
+        def cube(poids=None):
+            brut = np.bincount(cellule, weights=poids, minlength=taille).reshape(forme)
+            # Cumul le long des prix, avec un zéro en tête : [a, b] = C[b + 1] - C[a]
+            return np.concatenate([np.zeros(forme[:2] + (1,)), np.cumsum(brut, axis=2)], axis=2)
+
+        self._count = cube()
+        self._sum, self._sumsq = {}, {}
+        for nom, col in METRIQUES.items():
+            valeurs = np.nan_to_num(df[col].to_numpy(dtype=float)[ok])
+            self._sum[nom] = cube(valeurs)
+            self._sumsq[nom] = cube(valeurs ** 2)
+
+        self._histo = {}
+        for nom, edges in (("reviews", BINS_REVIEWS), ("dispo", BINS_DISPO)):
+            valeurs = np.nan_to_num(df[METRIQUES[nom]].to_numpy(dtype=float)[ok])
+            b = np.clip(np.searchsorted(edges, valeurs, side="right") - 1, 0, len(edges) - 2)
+            nb_bins = len(edges) - 1
+            brut = np.bincount(cellule * nb_bins + b, minlength=taille * nb_bins)
+            brut = brut.reshape(forme + (nb_bins,)).astype(np.int32)
+            self._histo[nom] = np.concatenate(
+                [np.zeros(forme[:2] + (1, nb_bins), dtype=np.int32),
+                 np.cumsum(brut, axis=2, dtype=np.int32)], axis=2
+            )
+
+        self.prix_median_global = _quantile_prix(np.diff(self._count.sum(axis=(0, 1))), 0.5)
+
+    def query(self, quartiers, types, prix_range):
+        lo = int(np.clip(np.ceil(prix_range[0]), 0, PRIX_MAX + 1))
+        hi = int(np.clip(np.floor(prix_range[1]), -1, PRIX_MAX + 1)) + 1
+        hi = max(hi, lo)
+        q = np.flatnonzero(lookup(self.quartiers, quartiers))
+        t = np.flatnonzero(lookup(self.types, types))
+
+        def plage(c):
+            # (quartiers choisis, ...) sommés sur les types choisis
+            sel = c[q][:, t]
+            return (sel[:, :, hi] - sel[:, :, lo]).sum(axis=1)
+
+        def histo_prix():
+            sel = self._count[q][:, t][:, :, lo:hi + 1].sum(axis=1)
+            return np.diff(sel, axis=1)
+
+        return CubeSelection(
+            quartiers=[self.quartiers[i - 1] for i in q], lo=lo,
+            count=plage(self._count),
+            sums={k: plage(v) for k, v in self._sum.items()},
+            sumsqs={k: plage(v) for k, v in self._sumsq.items()},
+            histo_prix=histo_prix(),
+            histos={k: plage(v) for k, v in self._histo.items()},
+            prix_median_global=self.prix_median_global,
+        )
+
+
+class CubeSelection:
+    """Agrégats d'une sélection, par quartier (`par_quartier`) et au total (`total`)."""
+
+    def __init__(self, quartiers, lo, count, sums, sumsqs, histo_prix, histos,
+                 prix_median_global):
+        self.quartiers, self._lo = quartiers, lo
+        self.prix_median_global = prix_median_global
+        self._count, self._sums, self._sumsqs = count, sums, sumsqs
+        self._histo_prix, self._histos = histo_prix, histos
+
+    def _stats(self, n, sums, sumsqs, histo_prix, histos):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            moy = {k: sums[k] / n for k in sums}
+            var = (sumsqs["prix"] - sums["prix"] ** 2 / n) / (n - 1)
+        return {
+            "annonces": n,
+            "prix_moyen": moy["prix"],
+            "prix_median": self._lo + _quantile_prix(histo_prix, 0.5),
+            "prix_std": np.sqrt(max(var, 0)) if n > 1 else np.nan,
+            "prix_q1": self._lo + _quantile_prix(histo_prix, 0.25),
+            "prix_q3": self._lo + _quantile_prix(histo_prix, 0.75),
+            "reviews_moyen": moy["reviews"],
+            "reviews_median": _quantile_bins(histos["reviews"], BINS_REVIEWS, 0.5),
+            "dispo_moyenne": moy["dispo"],
+            "dispo_median": _quantile_bins(histos["dispo"], BINS_DISPO, 0.5),
+        }
+
+    @property
+    def par_quartier(self):
+        lignes = []
+        for i, quartier in enumerate(self.quartiers):
+            n = int(self._count[i])
+            if n == 0:
+                continue
+            stats = self._stats(
+                n, {k: v[i] for k, v in self._sums.items()},
+                {k: v[i] for k, v in self._sumsqs.items()}, self._histo_prix[i],
+                {k: v[i] for k, v in self._histos.items()},
+            )
+            lignes.append({"neighbourhood_cleansed": quartier, **stats})
+        return pd.DataFrame(lignes, columns=["neighbourhood_cleansed", "annonces", "prix_moyen",
+                                             "prix_median", "prix_std", "prix_q1", "prix_q3",
+                                             "reviews_moyen", "reviews_median",
+                                             "dispo_moyenne", "dispo_median"])
+
+    @property
+    def total(self):
+        return self._stats(
+            int(self._count.sum()), {k: v.sum() for k, v in self._sums.items()},
+            {k: v.sum() for k, v in self._sumsqs.items()}, self._histo_prix.sum(axis=0),
+            {k: v.sum(axis=0) for k, v in self._histos.items()},
+        )
@@ -0,0 +1,83 @@
+import io
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import openpyxl
+except ImportError:  # export Excel optionnel
+    openpyxl = None
+
+# Format -> (type MIME, extension)
+FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+}
+# Colonnes exportées pour une sélection d'annonces
+COLONNES_SELECTION = ["id", "name", "neighbourhood_cleansed", "room_type", "price",
+                      "availability_365", "number_of_reviews", "reviews_per_month",
+                      "latitude", "longitude", "listing_url"]
+TAILLE_BLOC = 20_000
+# Au-delà, le fichier en cours d'écriture passe de la mémoire au disque
+SPOOL_MAX = 16 * 1024 * 1024
+
+
+def available_formats():
+    return [f for f in FORMATS if f != "xlsx" or openpyxl is not None]
+
+
+def _blocs(df, colonnes, taille_bloc):
+    """Tranches successives de `df`, limitées à `colonnes` (seules copies matérialisées)."""
+    colonnes = [c for c in colonnes if c in df]
+    for debut in range(0, max(len(df), 1), taille_bloc):
+        yield df.iloc[debut:debut + taille_bloc][colonnes]
+
+
+def _write_csv(blocs, fichier):
+    texte = io.TextIOWrapper(fichier, encoding="utf-8-sig", newline="", write_through=True)
+    for i, bloc in enumerate(blocs):
+        bloc.to_csv(texte, header=i == 0, index=False)
+    texte.detach()
+
+
+def _write_parquet(blocs, fichier):
+    writer = None
+    for bloc in blocs:
+        table = pa.Table.from_pandas(bloc, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(fichier, table.schema, compression="zstd")
+        writer.write_table(table)
+    writer.close()
+
+
+def _write_xlsx(blocs, fichier):
+    if openpyxl is None:
+        raise ImportError("L'export Excel nécessite openpyxl (pip install openpyxl)")
+    classeur = openpyxl.Workbook(write_only=True)
+    feuille = classeur.create_sheet("export")
+    for i, bloc in enumerate(blocs):
+        if i == 0:
+            feuille.append(list(bloc.columns))
+        for ligne in bloc.itertuples(index=False):
+            feuille.append([None if v != v else v for v in ligne])  # NaN -> cellule vide
+    classeur.save(fichier)
+
+
+_WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "xlsx": _write_xlsx}
+
+
+def export_frame(df, colonnes, fmt="csv", taille_bloc=TAILLE_BLOC):
+    """Écrit `df[colonnes]` au format `fmt`, par blocs, dans un fichier temporaire
+    (en mémoire jusqu'à SPOOL_MAX, sur disque au-delà), renvoyé rembobiné.
+
+    Seul un bloc de `taille_bloc` lignes projeté sur `colonnes` est copié à la fois : la
+    mémoire utilisée pour l'écriture ne dépend pas de la taille de la sélection.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Format inconnu : {fmt} (attendu : {', '.join(FORMATS)})")
+    fichier = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX)
+    _WRITERS[fmt](_blocs(df, colonnes, taille_bloc), fichier)
+    fichier.seek(0)
+    return fichier
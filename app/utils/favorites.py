@@ -0,0 +1,53 @@
+import datetime
+import os
+import sqlite3
+
+from app.utils.load import CACHE_DIR
+
+FAVORITES_DB = os.environ.get("favorites_path", os.path.join(CACHE_DIR, "favoris.sqlite"))
+
+
+class FavoritesStore:
+    """Favoris de chaque utilisateur, enregistrés par `id` d'annonce dans SQLite.
+
+    Seuls les identifiants sont stockés : les lignes affichées sont retrouvées dans le
+    jeu de données au moment du rendu (favorites_frame). Une connexion est ouverte par
+    opération, ce qui permet de partager l'instance entre les sessions Streamlit.
+    """
+
+    def __init__(self, path=FAVORITES_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS favoris ("
+                " user TEXT NOT NULL, listing_id INTEGER NOT NULL, ajoute_le TEXT NOT NULL,"
+                " PRIMARY KEY (user, listing_id)) WITHOUT ROWID"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def ids(self, user):
+        """Identifiants des annonces favorites de `user`."""
+        with self._connect() as con:
+            rows = con.execute("SELECT listing_id FROM favoris WHERE user = ?", (user,))
+            return {listing_id for (listing_id,) in rows}
+
+    def add(self, user, ids):
+        maintenant = datetime.datetime.now().isoformat(timespec="seconds")
+        with self._connect() as con:
+            con.executemany(
+                "INSERT OR IGNORE INTO favoris (user, listing_id, ajoute_le) VALUES (?, ?, ?)",
+                [(user, int(i), maintenant) for i in ids],
+            )
+
+    def remove(self, user, ids):
+        with self._connect() as con:
+            con.executemany("DELETE FROM favoris WHERE user = ? AND listing_id = ?",
+                            [(user, int(i)) for i in ids])
+
+
+def favorites_frame(df, ids):
+    """Lignes de `df` correspondant aux identifiants favoris, en une seule jointure."""
+    return df[df["id"].isin(list(ids))]
@@ -1,7 +1,141 @@
+import uuid
+
 import streamlit as st
+from app.utils.anomalies import PriceAnomalies
+from app.utils.backend import DuckDBBackend, use_duckdb
+from app.utils.clusters import ClusterIndex
+from app.utils.cube import StatsCube
+from app.utils.favorites import FavoritesStore
+from app.utils.hexgrid import HexGrid
+from app.utils.index import FilterIndex
+from app.utils.load import current_snapshot, list_snapshots, load_artifact, load_data
+from app.utils.neighbors import NeighborIndex
+from app.utils.pricing import PriceModel
+
+
+@st.cache_resource(show_spinner=False)
+def get_duckdb_backend(snapshot=None):
+    """Moteur DuckDB sur le Parquet du jeu de données courant (ou sur un snapshot passé)."""
+    return DuckDBBackend(current_snapshot() if snapshot is None else load_data(snapshot))
+
+
+@st.cache_resource(show_spinner=False)
+def get_filter_index(snapshot=None):
+    """Index de filtrage du jeu de données courant, partagé par toutes les sessions.
+
+    Avec analytics_backend=duckdb, le filtrage est confié au moteur DuckDB.
+    """
+    if use_duckdb():
+        return get_duckdb_backend(snapshot)
+    index = load_artifact("filtres") if snapshot is None else None
+    return index if index is not None else FilterIndex(load_data(snapshot))
+
+
+@st.cache_resource(show_spinner=False)
+def get_stats_cube(snapshot=None):
+    """Cube de statistiques du jeu de données courant, partagé par toutes les sessions.
+
+    Avec analytics_backend=duckdb, les agrégats sont calculés par le moteur DuckDB.
+    """
+    if use_duckdb():
+        return get_duckdb_backend(snapshot)
+    cube = load_artifact("cube") if snapshot is None else None
+    return cube if cube is not None else StatsCube(load_data(snapshot))
+
+
+@st.cache_resource(show_spinner=False)
+def get_cluster_index(snapshot=None):
+    """Index de regroupement cartographique du jeu de données courant."""
+    index = load_artifact("clusters") if snapshot is None else None
+    return index if index is not None else ClusterIndex(load_data(snapshot))
+
+
+@st.cache_resource(show_spinner=False)
+def get_hex_grid(snapshot=None):
+    """Grille hexagonale de densité (carte aux zooms faibles) du jeu de données courant."""
+    grille = load_artifact("hexagones") if snapshot is None else None
+    return grille if grille is not None else HexGrid(load_data(snapshot))
+
+
+@st.cache_resource(show_spinner=False)
+def get_price_anomalies(snapshot=None):
+    """Scores d'anomalie de prix du jeu de données courant, calculés sur toute la ville."""
+    anomalies = load_artifact("anomalies") if snapshot is None else None
+    return anomalies if anomalies is not None else PriceAnomalies(load_data(snapshot))
+
+
+@st.cache_resource(show_spinner=False)
+def get_neighbor_index(snapshot=None):
+    """Index spatial (plus proches voisins par type de logement) du jeu de données courant."""
+    index = load_artifact("voisins") if snapshot is None else None
+    return index if index is not None else NeighborIndex(load_data(snapshot))
+
+
+@st.cache_resource(show_spinner=False)
+def get_price_model(snapshot=None):
+    """Modèle de prix suggéré, entraîné sur le jeu de données courant."""
+    modele = load_artifact("prix") if snapshot is None else None
+    return modele if modele is not None else PriceModel(load_data(snapshot))
+
+
+@st.cache_resource(show_spinner=False)
+def get_favorites_store():
+    """Base des favoris, partagée par toutes les sessions."""
+    return FavoritesStore()
+
+
+def current_user():
+    """Jeton de l'utilisateur, qui retrouve ses favoris d'une visite à l'autre.
 
+    Lu dans l'URL (?user=...) à la première exécution de la session puis gardé en session,
+    et réécrit dans l'URL à chaque page : st.switch_page et la navigation entre pages
+    vident les paramètres d'URL.
+    """
+    if "user" not in st.session_state:
+        st.session_state["user"] = st.query_params.get("user") or uuid.uuid4().hex
+    if st.query_params.get("user") != st.session_state["user"]:
+        st.query_params["user"] = st.session_state["user"]
+    return st.session_state["user"]
 
-def apply_filters(df, quartiers, types, prix_range):
+
+def session_favorites():
+    """Identifiants favoris de l'utilisateur courant, chargés une fois par session et par
+    jeton."""
+    user = current_user()
+    key = f"favoris_{user}"
+    if key not in st.session_state:
+        st.session_state[key] = get_favorites_store().ids(user)
+    return st.session_state[key]
+
+
+def add_favorites(ids):
+    """Ajoute les `ids` absents des favoris ; renvoie ceux effectivement ajoutés."""
+    favoris = session_favorites()
+    nouveaux = [i for i in ids if i not in favoris]
+    if nouveaux:
+        get_favorites_store().add(current_user(), nouveaux)
+        favoris.update(nouveaux)
+    return nouveaux
+
+
+def remove_favorites(ids):
+    favoris = session_favorites()
+    retires = [i for i in ids if i in favoris]
+    if retires:
+        get_favorites_store().remove(current_user(), retires)
+        favoris.difference_update(retires)
+    return retires
+
+
+def apply_filters(df, quartiers, types, prix_range, index=None):
+    """Filtre `df` ; avec `index` (construit sur `df`), la sélection passe par l'index.
+
+    L'index du résultat contient les positions des lignes retenues : les composants
+    peuvent le réutiliser (`filtered_df.index`) pour interroger les structures
+    précalculées alignées sur le jeu de données.
+    """
+    if index is not None:
+        return df.take(index.select(quartiers, types, prix_range))
     return df[
         (df["neighbourhood_cleansed"].isin(quartiers)) &
         (df["room_type"].isin(types)) &
@@ -9,6 +143,34 @@ def apply_filters(df, quartiers, types, prix_range):
     ]
 
 
+# Clé de session de la sélection courante, lue par les fragments de la page
+SELECTION_KEY = "selection"
+
+
+def share_selection(ctx):
+    """Publie le SelectionContext de l'exécution complète pour les fragments de la page.
+
+    Un fragment relancé seul (carte déplacée, favori ajouté) relit cette sélection au lieu
+    de refiltrer : elle ne change qu'avec les filtres, qui relancent toute la page.
+    """
+    st.session_state[SELECTION_KEY] = ctx
+    return ctx
+
+
+def current_selection():
+    return st.session_state[SELECTION_KEY]
+
+
+def render_snapshot_selector():
+    """Choix du snapshot consulté, proposé dès que l'entrepôt en contient plusieurs."""
+    snapshots = list_snapshots()
+    if len(snapshots) < 2:
+        return None
+    choix = st.sidebar.selectbox("🗓️ Données", ["Actuelles"] + snapshots[::-1],
+                                 help="Consulter le marché tel qu'il était à un snapshot passé.")
+    return None if choix == "Actuelles" else choix
+
+
 def render_sidebar_filters(df, default_quartiers=5):
     st.sidebar.header("🔍 Filtres")
 
@@ -24,20 +186,6 @@ def render_sidebar_filters(df, default_quartiers=5):
     return selected_neigh, selected_types, selected_price
 
 
-def detect_bons_plans(df):
-    prix_med = df["price"].median()
-    reviews_med = df["number_of_reviews"].median()
-    dispo_med = df["availability_365"].median()
-    recent_booking = df["total_booked_6m"].median() if "total_booked_6m" in df else 0
-
-    return df[
-        (df["price"] <= prix_med) &
-        (df["number_of_reviews"] >= reviews_med) &
-        (df["availability_365"] >= dispo_med) &
-        (df.get("total_booked_6m", 0) >= recent_booking)
-    ]
-
-
 def compare_to_global_median(df_local, df_global):
     prix_moyen_local = df_local["price"].mean()
     prix_median_global = df_global["price"].median()
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+from app.utils.neighbors import KM_PAR_DEGRE
+
+# Rayon des hexagones (km) par niveau, du plus grossier au plus fin : une trentaine de
+# pixels à l'écran au zoom de chaque niveau
+TAILLES_KM = (4.0, 2.0, 1.0, 0.5)
+# Zoom minimal de chaque niveau ; à partir de ZOOM_POINTS, la carte montre les annonces
+ZOOMS = (0, 11, 12, 13)
+ZOOM_POINTS = 14
+_DECALAGE = 1 << 20  # les coordonnées axiales (q, r), signées, sont décalées dans la clé
+_RACINE3 = np.sqrt(3)
+
+
+class HexGrid:
+    """Agrégats des annonces sur des grilles hexagonales à plusieurs résolutions.
+
+    Chaque annonce reçoit une fois pour toutes sa cellule à chaque niveau (projection
+    locale en km, coordonnées axiales arrondies). Par niveau, les annonces sont aussi
+    triées par (cellule, prix) : une sélection s'agrège en une passe, sans nouveau tri,
+    en gardant cet ordre pour ses seules lignes (effectif, prix médian, disponibilité
+    moyenne par cellule).
+    """
+
+    def __init__(self, df):
+        lat = df["latitude"].to_numpy(dtype=float)
+        lon = df["longitude"].to_numpy(dtype=float)
+        self.prix = df["price"].to_numpy(dtype=float)
+        self.dispo = df["availability_365"].to_numpy(dtype=float)
+        valides = np.isfinite(lat) & np.isfinite(lon)
+        self.lat0 = float(np.mean(lat[valides])) if valides.any() else 0.0
+        self.lon0 = float(np.mean(lon[valides])) if valides.any() else 0.0
+        self._cos0 = np.cos(np.radians(self.lat0))
+
+        positions = np.flatnonzero(valides)
+        x, y = self._km(lat[positions], lon[positions])
+        self.codes, self._ordres = [], []
+        for taille in TAILLES_KM:
+            q, r = _arrondi_hex((_RACINE3 / 3 * x - y / 3) / taille, 2 / 3 * y / taille)
+            codes = np.full(len(df), -1, dtype=np.int64)
+            codes[positions] = (q + _DECALAGE) << 21 | (r + _DECALAGE)
+            self.codes.append(codes)
+            # Prix manquants en fin de cellule (np.lexsort les place après les valeurs)
+            self._ordres.append(positions[np.lexsort((self.prix[positions], codes[positions]))])
+
+    def _km(self, lat, lon):
+        return ((lon - self.lon0) * KM_PAR_DEGRE * self._cos0, (lat - self.lat0) * KM_PAR_DEGRE)
+
+    def _latlon(self, x, y):
+        return self.lat0 + y / KM_PAR_DEGRE, self.lon0 + x / (KM_PAR_DEGRE * self._cos0)
+
+    @staticmethod
+    def niveau(zoom):
+        """Niveau de grille adapté au zoom de la carte."""
+        return int(np.searchsorted(ZOOMS, zoom, side="right")) - 1
+
+    def cells(self, rows, zoom):
+        """Cellules non vides de la sélection `rows` au niveau du `zoom` : centre,
+        annonces, prix médian et disponibilité moyenne."""
+        niveau = self.niveau(zoom)
+        retenues = np.zeros(len(self.prix), dtype=bool)
+        retenues[rows] = True
+        ordre = self._ordres[niveau]
+        ordre = ordre[retenues[ordre]]
+        codes = self.codes[niveau][ordre]
+        if len(codes) == 0:
+            return pd.DataFrame(columns=["latitude", "longitude", "annonces", "prix_median",
+                                         "dispo_moyenne", "taille_km"])
+
+        debut = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        effectif = np.diff(np.r_[debut, len(codes)])
+        prix = self.prix[ordre]
+        finis = np.add.reduceat(np.isfinite(prix), debut)
+        bas = debut + np.maximum(finis - 1, 0) // 2
+        haut = debut + finis // 2
+        with np.errstate(invalid="ignore"):
+            mediane = np.where(finis > 0, (prix[bas] + prix[np.minimum(haut, len(prix) - 1)]) / 2,
+                               np.nan)
+
+        taille = TAILLES_KM[niveau]
+        q = (codes[debut] >> 21) - _DECALAGE
+        r = (codes[debut] & ((1 << 21) - 1)) - _DECALAGE
+        lat, lon = self._latlon(taille * _RACINE3 * (q + r / 2), taille * 1.5 * r)
+        return pd.DataFrame({
+            "latitude": lat, "longitude": lon, "annonces": effectif,
+            "prix_median": mediane,
+            "dispo_moyenne": np.add.reduceat(np.nan_to_num(self.dispo[ordre]), debut) / effectif,
+            "taille_km": taille,
+        })
+
+    def polygons(self, cells):
+        """Sommets (lon, lat) des hexagones de `cells`, un tableau (n, 7, 2) fermé."""
+        angles = np.radians(30 + 60 * np.arange(7))
+        x, y = self._km(cells["latitude"].to_numpy(), cells["longitude"].to_numpy())
+        taille = cells["taille_km"].to_numpy()[:, None]
+        lat, lon = self._latlon(x[:, None] + taille * np.cos(angles),
+                                y[:, None] + taille * np.sin(angles))
+        return np.stack([lon, lat], axis=-1)
+
+
+def _arrondi_hex(q, r):
+    """Arrondi de coordonnées axiales fractionnaires à l'hexagone le plus proche."""
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    rq = np.where((dq > dr) & (dq > ds), -rr - rs, rq)
+    rr = np.where(~((dq > dr) & (dq > ds)) & (dr > ds), -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
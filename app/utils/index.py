@@ -0,0 +1,88 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+def encode(series):
+    """Encodage dictionnaire : (valeurs, codes) avec le code 0 réservé aux valeurs manquantes."""
+    codes, valeurs = pd.factorize(series, sort=True)
+    return list(valeurs), (codes + 1).astype(np.int32)
+
+
+def lookup(valeurs, selection):
+    """Table de correspondance code -> sélectionné, indexée comme les codes de `encode`."""
+    table = np.zeros(len(valeurs) + 1, dtype=bool)
+    positions = {v: i + 1 for i, v in enumerate(valeurs)}
+    table[[positions[v] for v in selection if v in positions]] = True
+    return table
+
+
+class FilterIndex:
+    """Index de filtrage construit une fois par jeu de données.
+
+    Chaque quartier pointe vers la liste triée de ses lignes, les types de logement sont
+    encodés en entiers et les prix sont triés : une sélection se résout par recherche
+    dichotomique sur les prix puis intersection avec les quartiers et types, sans
+    parcourir toute la table. Les dernières sélections sont mémorisées (LRU) et renvoient
+    le même tableau de lignes, en lecture seule, à tous les appelants.
+    """
+
+    def __init__(self, df, cache_size=128):
+        self.quartiers, self._code_quartier = encode(df["neighbourhood_cleansed"])
+        self.types, self._code_type = encode(df["room_type"])
+
+        # Lignes de chaque quartier : tranches contiguës d'un tri stable par code
+        self._ordre_quartier = np.argsort(self._code_quartier, kind="stable")
+        self._bornes_quartier = np.searchsorted(
+            self._code_quartier[self._ordre_quartier], np.arange(len(self.quartiers) + 2)
+        )
+
+        self._prix = df["price"].to_numpy(dtype=float)
+        self._ordre_prix = np.argsort(self._prix, kind="stable")
+        self._prix_tries = self._prix[self._ordre_prix]
+
+        self._cache_size = cache_size
+        self._select = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def __getstate__(self):
+        # Le cache LRU n'est pas sérialisable : il est recréé au chargement
+        return {k: v for k, v in self.__dict__.items() if k != "_select"}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._select = lru_cache(maxsize=self._cache_size)(self._resolve)
+
+    def select(self, quartiers, types, prix_range):
+        """Positions (triées, lecture seule) des lignes correspondant à la sélection."""
+        return self._select(
+            tuple(sorted(set(quartiers))), tuple(sorted(set(types))),
+            (float(prix_range[0]), float(prix_range[1]))
+        )
+
+    def _resolve(self, quartiers, types, prix_range):
+        prix_min, prix_max = prix_range
+        lo = np.searchsorted(self._prix_tries, prix_min, side="left")
+        hi = np.searchsorted(self._prix_tries, prix_max, side="right")
+
+        table_quartier = lookup(self.quartiers, quartiers)
+        codes = np.flatnonzero(table_quartier)
+        taille_quartiers = int(
+            (self._bornes_quartier[codes + 1] - self._bornes_quartier[codes]).sum()
+        )
+
+        # On part de l'ensemble le plus petit : les quartiers choisis ou la plage de prix
+        if taille_quartiers <= hi - lo:
+            rows = np.concatenate(
+                [self._ordre_quartier[self._bornes_quartier[c]:self._bornes_quartier[c + 1]]
+                 for c in codes] or [np.empty(0, dtype=np.intp)]
+            )
+            prix = self._prix[rows]
+            rows = rows[(prix >= prix_min) & (prix <= prix_max)]
+        else:
+            rows = self._ordre_prix[lo:hi]
+            rows = rows[table_quartier[self._code_quartier[rows]]]
+
+        rows = np.sort(rows[lookup(self.types, types)[self._code_type[rows]]])
+        rows.flags.writeable = False
+        return rows
@@ -1,13 +1,236 @@
 import os
+import functools
+import glob
+import hashlib
+import json
+import pickle
+from typing import NamedTuple
+
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+import requests
 import streamlit as st
+from app.utils.seasonality import SeasonalIndex
+from app.utils.shared import freeze
+
+URL_RAW = "https://minio.lab.sspcloud.fr/greatisma/Dashboard-Airbnb-paris/data/processed/listings-enriched-2025-04-20.csv"
+CACHE_DIR = os.environ.get(
+    "cache_dir", os.path.join(os.path.expanduser("~"), ".cache", "dashboard-airbnb")
+)
+SNAPSHOT_FORMAT = "3"  # à incrémenter quand la structure du snapshot change
+BUNDLE_DIR = os.environ.get("bundle_path", "artifacts")
+
+# Colonnes réellement utilisées par les pages : seules celles-ci sont relues du snapshot
+COLUMNS = [
+    "id", "name", "listing_url", "neighbourhood_cleansed", "room_type", "price",
+    "availability_365", "number_of_reviews", "reviews_per_month", "total_booked_6m",
+    "latitude", "longitude",
+]
+
+
+class Saisonnalite(NamedTuple):
+    """Disponibilités mensuelles : une ligne par annonce (même ordre que load_data)."""
+    mois: np.ndarray    # libellés "YYYY-MM" triés
+    dispos: np.ndarray  # (n_annonces, n_mois) int16, -1 quand le mois est absent
+
+
+def split_listings(df):
+    """Sépare le format long (une ligne par annonce et par mois) en deux tables :
+    les annonces, dédupliquées par `id`, et la matrice des jours disponibles par mois.
+    """
+    if "month" not in df or "nb_jours_dispos" not in df:
+        return df.drop_duplicates("id").reset_index(drop=True), None
+
+    listings = (
+        df.drop(columns=["month", "nb_jours_dispos"])
+        .drop_duplicates("id")
+        .reset_index(drop=True)
+    )
+    facts = df[df["month"].notna() & df["nb_jours_dispos"].notna()]
+    rows = pd.Index(listings["id"]).get_indexer(facts["id"])
+    mois, cols = np.unique(facts["month"].to_numpy(dtype=str), return_inverse=True)
+    dispos = np.full((len(listings), len(mois)), -1, dtype=np.int16)
+    dispos[rows, cols] = facts["nb_jours_dispos"].to_numpy()
+    return listings, Saisonnalite(mois, dispos)
+
+
+def _source_version(source):
+    """Identifiant de version de la source : ETag / Last-Modified en HTTP, mtime sinon."""
+    if source.startswith(("http://", "https://")):
+        try:
+            resp = requests.head(source, timeout=5, allow_redirects=True)
+            resp.raise_for_status()
+        except requests.RequestException:
+            return None
+        return resp.headers.get("ETag") or resp.headers.get("Last-Modified")
+    stat = os.stat(source)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _snapshot_dir(source):
+    return os.path.join(CACHE_DIR, hashlib.sha1(source.encode()).hexdigest()[:16])
+
+
+def coerce_types(df):
+    """Typage explicite : les colonnes numériques lues comme texte sont converties, et les
+    prix arrondis à l'euro, le pas du curseur de prix et du StatsCube."""
+    for col in ("price", "reviews_per_month", "nb_jours_dispos"):
+        if col in df and df[col].dtype == object:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    if "price" in df:
+        df["price"] = df["price"].round()
+    return df
+
+
+def write_snapshot(df, path):
+    """Écrit un snapshot (annonces en Parquet + matrice de saisonnalité en .npy) dans `path`."""
+    listings, saison = split_listings(coerce_types(df))
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+    listings.to_parquet(os.path.join(tmp, "listings.parquet"), compression="zstd", index=False)
+    if saison is not None:
+        np.save(os.path.join(tmp, "mois.npy"), saison.mois)
+        np.save(os.path.join(tmp, "dispos.npy"), saison.dispos)
+    os.replace(tmp, path)
+
+
+def snapshot_path(source):
+    """Dossier du snapshot local de `source`, créé au premier appel.
+
+    Le snapshot est indexé par l'URL (ou le chemin) de la source et par son ETag / mtime :
+    une nouvelle version de la source produit un nouveau dossier. Si la version ne peut
+    pas être déterminée (hors ligne), on réutilise le snapshot le plus récent.
+    """
+    directory = _snapshot_dir(source)
+    version = _source_version(source)
+    if version is None:
+        existing = sorted(
+            glob.glob(os.path.join(directory, "*", "listings.parquet")), key=os.path.getmtime
+        )
+        if existing:
+            return os.path.dirname(existing[-1])
+        version = "unknown"
+    key = f"{SNAPSHOT_FORMAT}:{version}"
+    path = os.path.join(directory, hashlib.sha1(key.encode()).hexdigest()[:16])
+    if not os.path.exists(path):
+        write_snapshot(pd.read_csv(source), path)
+    return path
+
+
+def data_source():
+    return os.environ.get("data_path", URL_RAW)
+
+
+@functools.lru_cache(maxsize=1)
+def bundle_dir():
+    """Bundle d'artefacts précalculés (python -m app.build) pour la source courante.
+
+    Renvoie None si aucun bundle n'a été construit, ou s'il l'a été pour une autre source,
+    une autre version de la source (ETag / mtime, vérifiée quand elle peut être lue) ou un
+    autre format de snapshot : le dashboard retombe alors sur le chargement à chaud.
+    Déterminé une fois par processus : tous les artefacts viennent du même bundle.
+    """
+    try:
+        with open(os.path.join(BUNDLE_DIR, "current")) as f:
+            path = os.path.join(BUNDLE_DIR, f.read().strip())
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    source = data_source()
+    if manifest.get("source") != source or manifest.get("format") != SNAPSHOT_FORMAT:
+        return None
+    version = _source_version(source)
+    if version is not None and manifest.get("source_version") != version:
+        return None
+    return path
+
+
+def load_artifact(name):
+    """Artefact `name` du bundle courant, ou None s'il n'a pas été précalculé."""
+    path = bundle_dir()
+    if path is None or not os.path.exists(os.path.join(path, f"{name}.pkl")):
+        return None
+    with open(os.path.join(path, f"{name}.pkl"), "rb") as f:
+        return pickle.load(f)
+
+
+def current_snapshot():
+    """Dossier des données courantes : le bundle précalculé, sinon le snapshot local."""
+    return bundle_dir() or snapshot_path(data_source())
+
+
+def list_snapshots():
+    """Identifiants des snapshots de l'entrepôt incrémental (voir app/utils/snapshots.py)."""
+    from app.utils.snapshots import SnapshotStore  # import local : snapshots importe ce module
+    return SnapshotStore().ids()
+
+
+@st.cache_resource(show_spinner=False)
+def load_data(snapshot=None):
+    """Table des annonces : une ligne par `id`, index positionnel 0..n-1.
+
+    Sans `snapshot`, la source courante ; sinon l'état de l'entrepôt à ce snapshot. La
+    table est chargée une fois par processus et partagée, sans copie, par toutes les
+    sessions : elle est en lecture seule (SharedFrame).
+
+    `df.attrs["version"]` identifie le jeu de données chargé (dossier du bundle ou du
+    snapshot local, ou snapshot de l'entrepôt) et suit les sélections qui en sont tirées :
+    les caches de figures et de tableaux s'en servent pour distinguer deux jeux de données
+    de même taille.
+    """
+    if snapshot is None:
+        path = current_snapshot()
+        df = read_listings(path)
+    else:
+        from app.utils.snapshots import SnapshotStore
+        store = SnapshotStore()
+        df, path = store.read(snapshot), os.path.join(store.path, str(snapshot))
+    df.attrs["version"] = os.path.abspath(path)
+    return freeze(df)
+
+
+@st.cache_resource(show_spinner=False)
+def load_seasonality(snapshot=None):
+    """Matrice annonces × mois alignée sur load_data, indexée par quartier et type de
+    logement (SeasonalIndex), ou None si la source n'a pas de mois.
+
+    L'entrepôt ne conserve pas les mois des snapshots : pour un snapshot passé, None (les
+    vues de saisonnalité l'indiquent) plutôt que les mois de la source courante.
+    """
+    if snapshot is not None:
+        return None
+    saison = read_seasonality(current_snapshot())
+    if saison is None:
+        return None
+    return SeasonalIndex(load_data(snapshot),
+                         Saisonnalite(freeze(saison.mois), freeze(saison.dispos)))
 
 
 @st.cache_data(show_spinner=False)
-def load_data():
-    URL_RAW = "https://minio.lab.sspcloud.fr/greatisma/Dashboard-Airbnb-paris/data/processed/listings-enriched-2025-04-20.csv"
-    data_path = os.environ.get("data_path", URL_RAW)
-    return pd.read_csv(data_path)
+def load_price_evolution(snapshots):
+    """Prix médian par snapshot et par quartier ; `snapshots` sert de clé de cache."""
+    from app.utils.snapshots import SnapshotStore
+    return SnapshotStore().price_evolution()
+
+
+def read_listings(path):
+    """Relit les annonces en mémoire mappée, limitées aux colonnes utilisées par les pages."""
+    path = os.path.join(path, "listings.parquet")
+    available = pq.read_schema(path, memory_map=True).names
+    columns = [c for c in COLUMNS if c in available]
+    return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def read_seasonality(path):
+    if not os.path.exists(os.path.join(path, "dispos.npy")):
+        return None
+    return Saisonnalite(
+        np.load(os.path.join(path, "mois.npy")),
+        np.load(os.path.join(path, "dispos.npy"), mmap_mode="r"),
+    )
 
 
 @st.cache_data(show_spinner=False)
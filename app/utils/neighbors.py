@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+RAYON_TERRE_KM = 6371.0
+KM_PAR_DEGRE = np.pi * RAYON_TERRE_KM / 180
+CELLULE_KM = 0.25  # côté d'une cellule de la grille
+_BITS = 21         # bits par coordonnée de cellule dans la clé
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distance orthodromique en km (vectorisée)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * RAYON_TERRE_KM * np.arcsin(np.sqrt(a))
+
+
+class NeighborIndex:
+    """Grille de hachage des annonces par type de logement, pour les plus proches voisins.
+
+    Chaque annonce reçoit une clé (type, ligne de cellule, colonne de cellule) ; les
+    annonces sont triées par clé, si bien qu'une ligne de cellules d'un type est une
+    tranche contiguë du tri. Une requête ne calcule la distance exacte (haversine) que
+    pour les annonces des cellules qui recoupent le rayon, au lieu de toute la table.
+    """
+
+    def __init__(self, df):
+        lat = df["latitude"].to_numpy(dtype=float)
+        lon = df["longitude"].to_numpy(dtype=float)
+        types, self.types = pd.factorize(df["room_type"])
+        valides = np.isfinite(lat) & np.isfinite(lon) & (types >= 0)
+
+        self.lat0 = np.nanmin(lat[valides]) if valides.any() else 0.0
+        self.lon0 = np.nanmin(lon[valides]) if valides.any() else 0.0
+        self.pas_lat = CELLULE_KM / KM_PAR_DEGRE
+        # Cellules carrées à la latitude moyenne (les distances restent exactes)
+        lat_moy = np.nanmean(lat[valides]) if valides.any() else 0.0
+        self.pas_lon = self.pas_lat / np.cos(np.radians(lat_moy))
+
+        positions = np.flatnonzero(valides)
+        cles = self._cles(types[positions], lat[positions], lon[positions])
+        ordre = np.argsort(cles, kind="stable")
+        self.cles = cles[ordre]
+        self.positions = positions[ordre]
+        self.lat, self.lon = lat[self.positions], lon[self.positions]
+
+    def _cles(self, types, lat, lon):
+        iy = np.floor((lat - self.lat0) / self.pas_lat).astype(np.int64)
+        ix = np.floor((lon - self.lon0) / self.pas_lon).astype(np.int64)
+        iy, ix = np.clip(iy, 0, 2 ** _BITS - 1), np.clip(ix, 0, 2 ** _BITS - 1)
+        return (np.asarray(types, dtype=np.int64) << 2 * _BITS) | (iy << _BITS) | ix
+
+    def candidates(self, lat, lon, room_type, rayon_km):
+        """Indices (dans le tri) des annonces de `room_type` des cellules recoupant le rayon."""
+        code = self.types.get_indexer([room_type])[0]
+        if code < 0:
+            return np.empty(0, dtype=np.int64)
+        d_lat = rayon_km / KM_PAR_DEGRE
+        # Le degré de longitude est le plus court au bord du rayon le plus éloigné de l'équateur
+        d_lon = d_lat / max(np.cos(np.radians(min(abs(lat) + d_lat, 89.0))), 1e-6)
+        bas = self._cles([code], [lat - d_lat], [lon - d_lon])[0]
+        haut = self._cles([code], [lat + d_lat], [lon + d_lon])[0]
+        masque = (1 << _BITS) - 1
+        lignes = np.arange((bas >> _BITS) & masque, ((haut >> _BITS) & masque) + 1)
+        debut_ligne = (np.int64(code) << 2 * _BITS) | (lignes << _BITS)
+        debuts = np.searchsorted(self.cles, debut_ligne | (bas & masque), side="left")
+        fins = np.searchsorted(self.cles, debut_ligne | (haut & masque), side="right")
+        if not (fins > debuts).any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(d, f) for d, f in zip(debuts, fins) if f > d])
+
+    def nearest(self, lat, lon, room_type, k=10, rayon_km=1.0, exclure=None):
+        """Les `k` annonces de type `room_type` les plus proches de (lat, lon) dans un rayon
+        de `rayon_km`, de la plus proche à la plus éloignée.
+
+        Renvoie (positions dans le jeu de données, distances en km). `exclure` : position
+        d'une annonce à écarter (l'annonce de référence elle-même).
+        """
+        idx = self.candidates(lat, lon, room_type, rayon_km)
+        distances = haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+        garder = distances <= rayon_km
+        if exclure is not None:
+            garder &= self.positions[idx] != exclure
+        idx, distances = idx[garder], distances[garder]
+        if len(idx) > k:
+            proches = np.argpartition(distances, k)[:k]
+            idx, distances = idx[proches], distances[proches]
+        ordre = np.argsort(distances, kind="stable")
+        return self.positions[idx[ordre]], distances[ordre]
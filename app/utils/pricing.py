@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+# Intervalle de prix suggéré : quantiles des résidus (en log) du modèle
+QUANTILE_BAS, QUANTILE_HAUT = 0.1, 0.9
+
+
+class PriceModel:
+    """Régression hédonique du log-prix, ajustée par moindres carrés (numpy.linalg.lstsq).
+
+    Variables : quartier et type de logement (indicatrices), position (surface quadratique
+    en latitude / longitude), disponibilité, nombre d'avis et avis par mois. L'intervalle
+    est donné par les quantiles des résidus. Entraîné une fois par jeu de données, le
+    modèle garde aussi ses prédictions pour toutes les annonces (alignées sur les lignes) :
+    une sélection y lit ses lignes sans aucun calcul.
+    """
+
+    def __init__(self, df):
+        self.quartiers = pd.Index(df["neighbourhood_cleansed"].dropna().unique()).sort_values()
+        self.types = pd.Index(df["room_type"].dropna().unique()).sort_values()
+        self.lat0 = float(df["latitude"].mean())
+        self.lon0 = float(df["longitude"].mean())
+
+        X = self._design(df)
+        prix = df["price"].to_numpy(dtype=float)
+        valides = np.isfinite(X).all(axis=1) & (prix > 0)
+        y = np.log(prix[valides])
+        self.coef = np.linalg.lstsq(X[valides], y, rcond=None)[0]
+        residus = y - X[valides] @ self.coef
+        self.residu_bas, self.residu_haut = np.quantile(residus, [QUANTILE_BAS, QUANTILE_HAUT])
+        self.r2 = 1 - residus.var() / y.var()
+
+        self.suggere, self.bas, self.haut = self._predict(X)
+
+    def _design(self, df):
+        """Matrice des variables : constante, indicatrices (hors modalité de référence) et
+        variables numériques. Une modalité inconnue vaut la modalité de référence."""
+        n = len(df)
+        quartiers = self.quartiers.get_indexer(df["neighbourhood_cleansed"])
+        types = self.types.get_indexer(df["room_type"])
+        dlat = df["latitude"].to_numpy(dtype=float) - self.lat0
+        dlon = df["longitude"].to_numpy(dtype=float) - self.lon0
+        numeriques = np.column_stack([
+            dlat, dlon, dlat ** 2, dlon ** 2, dlat * dlon,
+            df["availability_365"].to_numpy(dtype=float) / 365,
+            np.log1p(df["number_of_reviews"].to_numpy(dtype=float)),
+            np.log1p(pd.to_numeric(df["reviews_per_month"], errors="coerce")
+                     .fillna(0).to_numpy(dtype=float)),
+        ])
+        nq, nt = len(self.quartiers) - 1, len(self.types) - 1
+        X = np.zeros((n, 1 + nq + nt + numeriques.shape[1]))
+        X[:, 0] = 1
+        lignes = np.arange(n)
+        for codes, debut in ((quartiers, 1), (types, 1 + nq)):
+            connus = codes > 0  # le code 0 est la modalité de référence
+            X[lignes[connus], debut + codes[connus] - 1] = 1
+        X[:, 1 + nq + nt:] = numeriques
+        return X
+
+    def _predict(self, X):
+        log_prix = X @ self.coef
+        return (np.exp(log_prix), np.exp(log_prix + self.residu_bas),
+                np.exp(log_prix + self.residu_haut))
+
+    def predict(self, df):
+        """(prix suggéré, borne basse, borne haute) de chaque annonce de `df`, en un appel."""
+        return self._predict(self._design(df))
+
+    def suggestions(self, rows, prix):
+        """Prix suggérés précalculés des lignes `rows` (positions dans le jeu de données),
+        arrondis à l'euro, et écart en % du prix actuel `prix` (Series alignée sur `rows`)
+        au prix suggéré."""
+        suggere = self.suggere[rows]
+        return pd.DataFrame({
+            "prix_suggere": suggere.round(0),
+            "prix_bas": self.bas[rows].round(0),
+            "prix_haut": self.haut[rows].round(0),
+            "ecart_suggere_pct": (100 * (prix.to_numpy(dtype=float) / suggere - 1)).round(1),
+        }, index=prix.index)
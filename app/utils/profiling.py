@@ -0,0 +1,147 @@
+import contextlib
+import functools
+import json
+import logging
+import os
+import time
+import warnings
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Activation globale (variable d'environnement) ou par session avec ?profile=1 dans l'URL
+PROFILING = os.environ.get("profiling", "0") == "1"
+
+logger = logging.getLogger("dashboard.profiling")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _compteur_disponible(ctx):
+    """Vrai si la session expose encore ScriptRunContext._enqueue, l'API privée de
+    Streamlit (1.66) par laquelle passent les messages comptés. Sinon, les octets ne sont
+    pas comptés (avertissement) et le profil garde les durées."""
+    if callable(getattr(ctx, "_enqueue", None)):
+        return True
+    warnings.warn("ScriptRunContext._enqueue introuvable dans cette version de Streamlit : "
+                  "les octets envoyés ne sont pas comptés", RuntimeWarning, stacklevel=3)
+    return False
+
+
+def _rerun_partiel():
+    """Vrai pendant le rerun d'un fragment seul (et non de toute la page)."""
+    ctx = get_script_run_ctx()
+    return ctx is not None and bool(ctx.fragment_ids_this_run)
+
+
+class _Profil:
+    page = None
+
+    def fragment(self, nom, rows=None):
+        """Décorateur st.fragment profilé.
+
+        Dans une exécution complète, le fragment est une section `nom` du profil de la page ;
+        lors d'un rerun partiel, il est profilé seul (une ligne JSON « page/nom »).
+        """
+        def decorateur(fn):
+            @functools.wraps(fn)
+            def executer(*args, **kwargs):
+                if not _rerun_partiel():
+                    with self.section(nom, rows):
+                        return fn(*args, **kwargs)
+                profil = start_profile(f"{self.page}/{nom}")
+                try:
+                    with profil.section(nom, rows):
+                        return fn(*args, **kwargs)
+                finally:
+                    profil.finish(panneau=False)
+            return st.fragment(executer)
+        return decorateur
+
+
+class PageProfile(_Profil):
+    """Profil d'une exécution de page : durée, lignes traitées et octets envoyés au
+    navigateur pour chaque section.
+
+    Les octets sont comptés sur les messages que la session transmet au navigateur
+    pendant la section : figures, tableaux et carte sérialisés, tels qu'envoyés.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.sections = []
+        self.octets = 0
+        self._debut = time.perf_counter()
+        ctx = get_script_run_ctx()
+        # Sans contexte (hors serveur) ou sans point d'accroche : durées seulement
+        self._ctx = ctx if ctx is not None and _compteur_disponible(ctx) else None
+        self._enqueue = None
+        if self._ctx is not None:
+            enqueue = self._ctx._enqueue
+            # Un profil interrompu par une exception a pu laisser son compteur en place
+            while isinstance(getattr(enqueue, "__self__", None), PageProfile):
+                enqueue = enqueue.__self__._enqueue
+            self._enqueue = enqueue
+            self._ctx._enqueue = self._compte
+
+    def _compte(self, msg):
+        self.octets += msg.ByteSize()
+        self._enqueue(msg)
+
+    @contextlib.contextmanager
+    def section(self, nom, rows=None):
+        """Mesure le bloc ; `rows` (ou mesure["lignes"] dans le bloc) : lignes traitées."""
+        mesure = {"section": nom, "lignes": rows}
+        octets, debut = self.octets, time.perf_counter()
+        try:
+            yield mesure
+        finally:
+            mesure["ms"] = round(1000 * (time.perf_counter() - debut), 2)
+            mesure["octets"] = self.octets - octets if self._ctx is not None else None
+            self.sections.append(mesure)
+
+    def finish(self, panneau=True):
+        """Termine le profil : ligne de log JSON et panneau de debug dans la barre latérale."""
+        if self._ctx is not None:
+            self._ctx._enqueue = self._enqueue
+        total = {
+            "page": self.page, "ms": round(1000 * (time.perf_counter() - self._debut), 2),
+            "octets": self.octets if self._ctx is not None else None,
+            "sections": self.sections,
+        }
+        logger.info(json.dumps(total, ensure_ascii=False))
+        if not panneau:
+            return total
+
+        with st.sidebar.expander("⏱️ Profil de l'exécution", expanded=False):
+            envoyes = "octets non comptés" if total["octets"] is None else \
+                f"{total['octets'] / 1024:.0f} Ko envoyés"
+            st.caption(f"{total['ms']:.0f} ms · {envoyes}")
+            st.dataframe(pd.DataFrame(self.sections, columns=["section", "ms", "lignes", "octets"]),
+                         hide_index=True)
+        return total
+
+
+class _ProfilInactif(_Profil):
+    """Profil désactivé : chaque section se réduit à un nullcontext."""
+
+    def __init__(self, page):
+        self.page = page
+
+    def section(self, nom, rows=None):
+        return contextlib.nullcontext({})
+
+    def finish(self, panneau=True):
+        return None
+
+
+def start_profile(page):
+    """Profil de l'exécution courante de `page`, ou un profil inactif sans surcoût."""
+    if PROFILING or st.query_params.get("profile") == "1":
+        return PageProfile(page)
+    return _ProfilInactif(page)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+
+def score_qualite_prix(df):
+    """Nombre d'avis par euro ; 0 quand le prix est nul ou manquant."""
+    prix = df["price"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = df["number_of_reviews"].to_numpy(dtype=float) / prix
+    return np.where(np.isfinite(score), score, 0.0)
+
+
+def score_bon_plan(df):
+    """Score composite dans [0, 1] : prix bas, beaucoup d'avis et forte disponibilité,
+    chacun mesuré par son rang centile dans la sélection.
+    """
+    return (
+        (1 - df["price"].rank(pct=True)) +
+        df["number_of_reviews"].rank(pct=True) +
+        df["availability_365"].rank(pct=True)
+    ).fillna(0).to_numpy() / 3
+
+
+SCORES = {
+    "qualite_prix": score_qualite_prix,
+    "bon_plan": score_bon_plan,
+}
+
+
+def _scores(df, score):
+    if isinstance(score, str):
+        score = SCORES[score]
+    valeurs = score(df) if callable(score) else score
+    return np.asarray(valeurs, dtype=float)
+
+
+def _top(valeurs, k):
+    """Positions des k plus grandes valeurs (sélection partielle), triées décroissantes."""
+    if k is not None and k < len(valeurs):
+        candidats = np.argpartition(-valeurs, k - 1)[:k]
+    else:
+        candidats = np.arange(len(valeurs))
+    # Tri final des seuls candidats ; à score égal, l'ordre d'origine est conservé
+    return candidats[np.lexsort((candidats, -valeurs[candidats]))]
+
+
+def top_k_positions(df, score, k=None, by=None, ascending=False):
+    """Positions des `k` meilleures lignes de `df` selon `score`, par groupe `by` si fourni.
+
+    `score` est le nom d'un score de SCORES, une fonction df -> valeurs ou un tableau de
+    valeurs. Sans `k`, toutes les lignes sont classées. Les groupes sont parcourus via
+    un seul tri stable des codes de groupe, puis une sélection partielle dans chacun.
+    """
+    valeurs = _scores(df, score)
+    valeurs = np.where(np.isnan(valeurs), -np.inf, -valeurs if ascending else valeurs)
+    if by is None:
+        return _top(valeurs, k)
+
+    codes, _ = pd.factorize(df[by], sort=True)
+    # Codes sur 16 bits quand c'est possible : le tri stable devient un tri par base, en O(n)
+    if codes.max(initial=-1) < np.iinfo(np.int16).max:
+        codes = codes.astype(np.int16)
+    ordre = np.argsort(codes, kind="stable")
+    bornes = np.searchsorted(codes[ordre], np.arange(codes.max(initial=-1) + 2))
+    morceaux = []
+    for debut, fin in zip(bornes[:-1], bornes[1:]):
+        groupe = ordre[debut:fin]
+        morceaux.append(groupe[_top(valeurs[groupe], k)])
+    return np.concatenate(morceaux) if morceaux else np.empty(0, dtype=np.intp)
+
+
+def top_k(df, score, k=None, by=None, ascending=False):
+    """Lignes de `df` correspondant à top_k_positions, dans l'ordre du classement."""
+    return df.iloc[top_k_positions(df, score, k, by, ascending)]
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from app.utils.index import encode
+
+
+class SeasonalIndex:
+    """Matrice annonces × mois des jours disponibles, indexée par (quartier, type).
+
+    Les lignes de la matrice sont rangées une fois pour toutes par groupe (quartier, type
+    de logement) : les jours disponibles d'une sélection se somment par groupe et par mois
+    en une réduction masquée des colonnes, sans tri ni groupby à chaque exécution.
+    Courbe mensuelle, carte de chaleur par quartier ou par type, tendance et haute/basse
+    saison se déduisent toutes de ce petit tableau (SaisonSelection).
+    """
+
+    def __init__(self, df, saison):
+        self.mois = saison.mois
+        self.jours = pd.PeriodIndex(self.mois, freq="M").days_in_month.to_numpy()
+        self.quartiers, code_q = encode(df["neighbourhood_cleansed"])
+        self.types, code_t = encode(df["room_type"])
+        groupes = code_q * (len(self.types) + 1) + code_t
+        self._ordre = np.argsort(groupes, kind="stable")
+        self._groupes = groupes[self._ordre]
+        # Copie contiguë rangée par groupe (int16) : le masque d'une sélection la parcourt
+        # dans l'ordre, y compris quand la source est mappée en mémoire
+        self._dispos = np.ascontiguousarray(saison.dispos[self._ordre])
+
+    def query(self, rows):
+        """Jours disponibles sommés par groupe (quartier, type) et par mois pour les
+        annonces `rows` (positions dans load_data)."""
+        retenues = np.zeros(len(self._ordre), dtype=bool)
+        retenues[rows] = True
+        masque = retenues[self._ordre]
+        groupes = self._groupes[masque]
+        if len(groupes) == 0:
+            vide = np.zeros((0, len(self.mois)), dtype=np.int64)
+            return SaisonSelection(self, groupes, vide, vide)
+        debut = np.flatnonzero(np.r_[True, groupes[1:] != groupes[:-1]])
+        dispos = self._dispos[masque]
+        # Mois absents (-1) : comptés pour 0 jour et exclus des effectifs
+        sommes = np.add.reduceat(np.maximum(dispos, 0), debut, axis=0, dtype=np.int64)
+        effectifs = np.add.reduceat(dispos >= 0, debut, axis=0, dtype=np.int64)
+        return SaisonSelection(self, groupes[debut], sommes, effectifs)
+
+
+class SaisonSelection:
+    """Jours disponibles d'une sélection : sommes et effectifs (groupes × mois)."""
+
+    def __init__(self, index, groupes, sommes, effectifs):
+        self.index = index
+        self.mois = index.mois
+        self.jours = index.jours
+        n_types = len(index.types) + 1
+        self.quartier = groupes // n_types  # codes de encode (0 : valeur manquante)
+        self.type = groupes % n_types
+        self.sommes = sommes
+        self.effectifs = effectifs
+
+    def total(self):
+        """(sommes, effectifs) par mois, toutes annonces de la sélection confondues."""
+        return self.sommes.sum(axis=0), self.effectifs.sum(axis=0)
+
+    def par(self, axe):
+        """(libellés, sommes, effectifs) par quartier (`axe="quartier"`) ou par type."""
+        codes, valeurs = ((self.quartier, self.index.quartiers) if axe == "quartier"
+                          else (self.type, self.index.types))
+        presents, inverse = np.unique(codes, return_inverse=True)
+        sommes = np.zeros((len(presents), len(self.mois)), dtype=np.int64)
+        effectifs = np.zeros_like(sommes)
+        np.add.at(sommes, inverse, self.sommes)
+        np.add.at(effectifs, inverse, self.effectifs)
+        libelles = [valeurs[c - 1] if c > 0 else "Inconnu" for c in presents]
+        return libelles, sommes, effectifs
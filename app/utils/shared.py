@@ -0,0 +1,97 @@
+import functools
+import inspect
+
+import numpy as np
+import pandas as pd
+
+
+def _refuse(*args, **kwargs):
+    raise TypeError(
+        "Jeu de données partagé entre sessions : travaillez sur une copie (df.copy()) ou sur "
+        "une sélection (apply_filters) plutôt que de le modifier en place."
+    )
+
+
+class _ReadOnlyIndexer:
+    """Indexeur (loc, iloc, at, iat) en lecture seule."""
+
+    def __init__(self, indexer):
+        self._indexer = indexer
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    def __call__(self, *args, **kwargs):
+        return _ReadOnlyIndexer(self._indexer(*args, **kwargs))
+
+    __setitem__ = _refuse
+
+
+def _sans_inplace(methode):
+    """`methode` refusée avec inplace=True, avant toute écriture."""
+    @functools.wraps(methode)
+    def appel(self, *args, **kwargs):
+        if kwargs.get("inplace"):
+            _refuse()
+        return methode(self, *args, **kwargs)
+    return appel
+
+
+class SharedFrame(pd.DataFrame):
+    """DataFrame partagé par toutes les sessions (st.cache_resource), en lecture seule.
+
+    Les écritures en place (colonnes, indexeurs, affectation de `columns` ou `index`,
+    méthodes `inplace=True` comme reset_index ou rename) lèvent TypeError, et les
+    tableaux numpy sous-jacents sont non modifiables. Tout résultat
+    dérivé (sélection, copie, calcul) est un DataFrame ordinaire : grâce au copy-on-write
+    de pandas, le modifier ne touche jamais la table partagée.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    __setitem__ = __delitem__ = insert = pop = _update_inplace = _refuse
+
+    def __setattr__(self, nom, valeur):
+        # columns, index et colonnes par attribut ; seuls les attributs internes de pandas
+        # (_mgr, _attrs...) restent modifiables
+        if not nom.startswith("_"):
+            _refuse()
+        super().__setattr__(nom, valeur)
+
+    @property
+    def loc(self):
+        return _ReadOnlyIndexer(super().loc)
+
+    @property
+    def iloc(self):
+        return _ReadOnlyIndexer(super().iloc)
+
+    @property
+    def at(self):
+        return _ReadOnlyIndexer(super().at)
+
+    @property
+    def iat(self):
+        return _ReadOnlyIndexer(super().iat)
+
+
+# Les méthodes à paramètre inplace (reset_index, rename, replace, fillna...) peuvent écrire
+# dans les blocs ou les axes avant d'atteindre _update_inplace : refusées dès l'appel
+for _nom, _methode in inspect.getmembers(pd.DataFrame, inspect.isfunction):
+    if not _nom.startswith("_") and "inplace" in inspect.signature(_methode).parameters:
+        setattr(SharedFrame, _nom, _sans_inplace(_methode))
+
+
+def freeze(obj):
+    """Rend `obj` (DataFrame ou tableau numpy) non modifiable, sans copie des données."""
+    if isinstance(obj, np.ndarray):
+        obj.flags.writeable = False
+        return obj
+    for bloc in obj._mgr.blocks:  # colonnes numériques : tableaux numpy des blocs
+        if isinstance(bloc.values, np.ndarray):
+            bloc.values.flags.writeable = False
+    partage = SharedFrame(obj, copy=False)
+    partage.attrs.update(obj.attrs)  # non repris par le constructeur
+    return partage
@@ -0,0 +1,154 @@
+import argparse
+import datetime
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+from app.utils.load import CACHE_DIR, COLUMNS, coerce_types, split_listings
+
+STORE_DIR = os.environ.get("store_path", os.path.join(CACHE_DIR, "snapshots"))
+
+# Colonnes dont la modification d'une annonce produit une ligne de delta
+TRACKED = ["price", "availability_365"]
+
+
+class SnapshotStore:
+    """Entrepôt local versionné des snapshots InsideAirbnb.
+
+    Le premier snapshot est stocké en entier ; chaque snapshot suivant n'ajoute qu'un
+    delta par `id` : annonces nouvelles, supprimées, ou dont le prix ou la disponibilité
+    ont changé. Une lecture « au snapshot X » rejoue les deltas sur la base.
+    """
+
+    def __init__(self, path=STORE_DIR):
+        self.path = path
+        self._manifest = os.path.join(path, "manifest.json")
+
+    def snapshots(self):
+        """Snapshots ingérés, du plus ancien au plus récent."""
+        if not os.path.exists(self._manifest):
+            return []
+        with open(self._manifest) as f:
+            return json.load(f)["snapshots"]
+
+    def ids(self):
+        return [s["id"] for s in self.snapshots()]
+
+    def _write_manifest(self, snapshots):
+        tmp = f"{self._manifest}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"snapshots": snapshots}, f, indent=2)
+        os.replace(tmp, self._manifest)
+
+    def ingest(self, df, snapshot_id):
+        """Ajoute `df` (format long ou une ligne par annonce) comme snapshot `snapshot_id`."""
+        snapshots = self.snapshots()
+        if snapshot_id in self.ids():
+            raise ValueError(f"Le snapshot {snapshot_id} est déjà ingéré")
+        if snapshots and snapshot_id < snapshots[-1]["id"]:
+            raise ValueError(f"Le snapshot {snapshot_id} est antérieur à {snapshots[-1]['id']}")
+
+        listings, _ = split_listings(coerce_types(df))
+        listings = listings[[c for c in COLUMNS if c in listings]]
+        os.makedirs(self.path, exist_ok=True)
+        fichier = f"{snapshot_id}.parquet"
+
+        if not snapshots:
+            listings.to_parquet(os.path.join(self.path, fichier), compression="zstd",
+                                index=False)
+            entry = {"id": snapshot_id, "fichier": fichier, "base": True,
+                     "annonces": len(listings)}
+        else:
+            delta = diff_listings(self.read(snapshots[-1]["id"]), listings)
+            delta.to_parquet(os.path.join(self.path, fichier), compression="zstd", index=False)
+            entry = {"id": snapshot_id, "fichier": fichier, "base": False,
+                     "annonces": len(listings),
+                     **delta["_op"].value_counts().reindex(
+                         ["new", "changed", "removed"], fill_value=0).astype(int).to_dict()}
+        self._write_manifest(snapshots + [entry])
+        return entry
+
+    def _deltas(self, snapshot_id=None, columns=None):
+        """(entrée du manifeste, table) de la base puis de chaque delta jusqu'à `snapshot_id`."""
+        for entry in self.snapshots():
+            cols = None if columns is None else list(columns) + ([] if entry["base"] else ["_op"])
+            yield entry, pd.read_parquet(os.path.join(self.path, entry["fichier"]), columns=cols)
+            if entry["id"] == snapshot_id:
+                return
+
+    def read(self, snapshot_id=None, columns=None):
+        """Table des annonces telle qu'au snapshot `snapshot_id` (par défaut le dernier)."""
+        if snapshot_id is not None and snapshot_id not in self.ids():
+            raise KeyError(snapshot_id)
+        state = None
+        for entry, table in self._deltas(snapshot_id, columns):
+            state = table if entry["base"] else apply_delta(state, table)
+        if state is None:
+            raise KeyError("Aucun snapshot ingéré")
+        return state.sort_values("id", kind="stable").reset_index(drop=True)
+
+    def price_evolution(self, by="neighbourhood_cleansed"):
+        """Prix médian par snapshot et par `by`, en rejouant uniquement (id, by, prix)."""
+        lignes, state = [], None
+        for entry, table in self._deltas(columns=["id", by, "price"]):
+            state = table if entry["base"] else apply_delta(state, table)
+            medianes = state.groupby(by)["price"].median()
+            lignes.append(medianes.rename(entry["id"]))
+        if not lignes:
+            return pd.DataFrame(columns=["snapshot", by, "price"])
+        evolution = pd.concat(lignes, axis=1).T
+        evolution.index.name = "snapshot"
+        return evolution.reset_index().melt(id_vars="snapshot", var_name=by, value_name="price")
+
+
+def diff_listings(ancien, nouveau, tracked=TRACKED):
+    """Delta entre deux tables d'annonces, avec une colonne `_op` :
+    `new` et `changed` portent la ligne complète, `removed` seulement l'`id`.
+    """
+    dans_ancien = nouveau["id"].isin(ancien["id"])
+    nouvelles = nouveau[~dans_ancien].assign(_op="new")
+    supprimees = ancien.loc[~ancien["id"].isin(nouveau["id"]), ["id"]].assign(_op="removed")
+
+    communs = nouveau[dans_ancien]
+    avant = ancien.set_index("id").reindex(communs["id"])
+    change = np.zeros(len(communs), dtype=bool)
+    for col in tracked:
+        if col not in communs or col not in avant:
+            continue
+        a, b = avant[col].to_numpy(), communs[col].to_numpy()
+        change |= ~((a == b) | (pd.isna(a) & pd.isna(b)))
+    modifiees = communs[change].assign(_op="changed")
+
+    return pd.concat([nouvelles, modifiees, supprimees], ignore_index=True)
+
+
+def apply_delta(state, delta):
+    """Applique un delta de diff_listings à une table d'annonces."""
+    touches = delta["id"]
+    ajouts = delta[delta["_op"] != "removed"].drop(columns="_op")
+    return pd.concat([state[~state["id"].isin(touches)], ajouts[state.columns]],
+                     ignore_index=True)
+
+
+def _snapshot_id(source):
+    """Date du snapshot déduite du nom de fichier (AAAA-MM-JJ), sinon la date du jour."""
+    match = re.search(r"\d{4}-\d{2}-\d{2}", os.path.basename(source))
+    return match.group(0) if match else datetime.date.today().isoformat()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingestion incrémentale d'un snapshot.")
+    parser.add_argument("source", help="CSV enrichi (URL ou chemin local)")
+    parser.add_argument("--id", help="identifiant du snapshot (défaut : date du fichier)")
+    parser.add_argument("--store", default=STORE_DIR, help="dossier de l'entrepôt")
+    args = parser.parse_args(argv)
+
+    entry = SnapshotStore(args.store).ingest(pd.read_csv(args.source),
+                                             args.id or _snapshot_id(args.source))
+    print(json.dumps(entry))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import importlib
+import logging
+import os
+import threading
+import time
+
+# Préchargement dès le démarrage du serveur (python -m app.serve), ou à la première visite
+# de l'accueil avec streamlit run ; preload=0 le désactive
+PRELOAD = os.environ.get("preload", "1") == "1"
+# Modules lourds des graphiques et de la carte : importés par les composants qui tracent,
+# jamais par Home.py
+MODULES = ("plotly.express", "plotly.graph_objects", "folium", "streamlit_folium")
+
+logger = logging.getLogger("dashboard.warmup")
+
+
+def _etapes():
+    """(libellé, fonction) des étapes, dans l'ordre où les pages en ont besoin."""
+    from app.utils import filters
+    from app.utils.load import load_data, load_seasonality
+
+    # Arguments passés comme dans les pages (load_data(snapshot), snapshot=None) : la clé de
+    # st.cache_resource dépend de la façon dont ils sont passés
+    return [
+        ("Données", lambda: load_data(None)),
+        ("Index de filtrage", lambda: filters.get_filter_index(None)),
+        ("Statistiques", lambda: filters.get_stats_cube(None)),
+        ("Saisonnalité", lambda: load_seasonality(None)),
+        ("Carte", lambda: (filters.get_cluster_index(None), filters.get_hex_grid(None))),
+        ("Anomalies de prix", lambda: filters.get_price_anomalies(None)),
+        ("Modèle de prix", lambda: filters.get_price_model(None)),
+        ("Concurrents proches", lambda: filters.get_neighbor_index(None)),
+        ("Graphiques", lambda: [importlib.import_module(nom) for nom in MODULES]),
+    ]
+
+
+class Warmup:
+    """Préchargement, dans un thread d'arrière-plan, du jeu de données, des index partagés
+    (st.cache_resource) et des modules de tracé.
+
+    Une session qui demande une ressource en cours de construction attend le verrou de
+    st.cache_resource au lieu de la recalculer ; les suivantes la trouvent en cache.
+    """
+
+    def __init__(self):
+        self.etapes = []      # (libellé, durée en s) des étapes terminées
+        self.en_cours = None  # libellé de l'étape en cours
+        self.total = None     # nombre d'étapes, connu au démarrage du thread
+        self.erreur = None
+        self.debut = self.fin = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self.debut = time.perf_counter()
+                self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            etapes = _etapes()
+            self.total = len(etapes)
+            for libelle, etape in etapes:
+                self.en_cours = libelle
+                debut = time.perf_counter()
+                etape()
+                self.etapes.append((libelle, time.perf_counter() - debut))
+        except Exception as exc:  # noqa: BLE001 (les pages chargeront à la demande)
+            self.erreur = exc
+            logger.exception("Préchargement interrompu à l'étape %s", self.en_cours)
+        finally:
+            self.en_cours = None
+            self.fin = time.perf_counter()
+
+    @property
+    def demarre(self):
+        return self._thread is not None
+
+    @property
+    def pret(self):
+        return self.fin is not None and self.erreur is None
+
+    def duree(self):
+        """Secondes écoulées depuis le démarrage (jusqu'à la fin s'il est terminé)."""
+        if self.debut is None:
+            return 0.0
+        return (self.fin or time.perf_counter()) - self.debut
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.pret
+
+
+_warmup = Warmup()
+
+
+def start_warmup():
+    """Lance le préchargement, une fois par processus, sauf avec preload=0 ; renvoie son
+    état (Warmup)."""
+    return _warmup.start() if PRELOAD else _warmup
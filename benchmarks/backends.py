@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+from app.utils.backend import DuckDBBackend
+from app.utils.cube import StatsCube
+from app.utils.filters import apply_filters
+from app.utils.index import FilterIndex
+from benchmarks import synthetic
+from benchmarks.run import mesure, selections
+
+COLONNES = ["annonces", "prix_moyen", "prix_median", "prix_std", "prix_q1", "prix_q3",
+            "reviews_moyen", "reviews_median", "dispo_moyenne", "dispo_median"]
+
+
+def agregats_pandas(df):
+    """Agrégats exacts de la sélection `df` en pandas : (par quartier, total)."""
+    def stats(groupe):
+        prix, reviews, dispo = (groupe["price"], groupe["number_of_reviews"],
+                                groupe["availability_365"])
+        return {
+            "annonces": prix.size(), "prix_moyen": prix.mean(), "prix_median": prix.median(),
+            "prix_std": prix.std(), "prix_q1": prix.quantile(0.25),
+            "prix_q3": prix.quantile(0.75), "reviews_moyen": reviews.mean(),
+            "reviews_median": reviews.median(), "dispo_moyenne": dispo.mean(),
+            "dispo_median": dispo.median(),
+        }
+    par_quartier = pd.DataFrame(stats(df.groupby("neighbourhood_cleansed"))).reset_index()
+    total = {k: v.iloc[0] if len(v) else np.nan
+             for k, v in stats(df.groupby(np.zeros(len(df)))).items()}
+    total["annonces"] = len(df)
+    return par_quartier, total
+
+
+def ecarts(df, moteur, cube, sel):
+    """Différences entre le chemin par défaut (apply_filters, StatsCube) et DuckDB pour une
+    sélection ; liste vide si identiques."""
+    differences = []
+    positions = apply_filters(df, *sel).index.to_numpy()
+    if not np.array_equal(positions, moteur.select(*sel)):
+        differences.append("positions")
+
+    attendu, resultat = cube.query(*sel), moteur.query(*sel)
+    if list(attendu.par_quartier["neighbourhood_cleansed"]) != list(
+            resultat.par_quartier["neighbourhood_cleansed"]):
+        return differences + ["quartiers"]
+    for col in COLONNES:
+        if not np.allclose(attendu.par_quartier[col].to_numpy(dtype=float),
+                           resultat.par_quartier[col].to_numpy(dtype=float),
+                           rtol=1e-9, atol=1e-9, equal_nan=True):
+            differences.append(f"par_quartier.{col}")
+        if not np.allclose(attendu.total[col], resultat.total[col], rtol=1e-9, atol=1e-9,
+                           equal_nan=True):
+            differences.append(f"total.{col}")
+    return differences
+
+
+def selections_parite(df, n, seed=0):
+    """Sélections par défaut et Paris, plus `n` sélections aléatoires (dont vides)."""
+    rng = np.random.default_rng(seed)
+    quartiers = sorted(df["neighbourhood_cleansed"].unique())
+    types = sorted(df["room_type"].unique())
+    cas = dict(selections(df))
+    cas["vide"] = ([], types, (50, 200))
+    for i in range(n):
+        lo = int(rng.integers(0, 300))
+        cas[f"aleatoire_{i}"] = (
+            list(rng.choice(quartiers, rng.integers(1, len(quartiers) + 1), replace=False)),
+            list(rng.choice(types, rng.integers(1, len(types) + 1), replace=False)),
+            (lo, lo + int(rng.integers(0, 800))),
+        )
+    return cas
+
+
+def bench_scale(scale, repeat, n_parite, seed=0):
+    df, _ = synthetic.listings(scale, seed)
+    with tempfile.TemporaryDirectory() as dossier:
+        df.to_parquet(os.path.join(dossier, "listings.parquet"), index=False)
+        moteur = DuckDBBackend(dossier)
+        index, cube = FilterIndex(df), StatsCube(df)
+
+        divergences = {nom: d for nom, sel in selections_parite(df, n_parite, seed).items()
+                       if (d := ecarts(df, moteur, cube, sel))}
+
+        resultats = []
+        for nom_sel, sel in selections(df).items():
+            cas = {
+                "pandas.filtre": lambda: apply_filters(df, *sel),
+                "pandas.agregats": lambda: agregats_pandas(apply_filters(df, *sel)),
+                "index.filtre": lambda: (index._select.cache_clear(),
+                                         apply_filters(df, *sel, index=index)),
+                "cube.agregats": lambda: cube.query(*sel).par_quartier,
+                "duckdb.filtre": lambda: apply_filters(df, *sel, index=moteur),
+                "duckdb.agregats": lambda: moteur.query(*sel),
+            }
+            for nom, fn in cas.items():
+                r = {"bench": nom, "scale": scale, "annonces": len(df), "selection": nom_sel,
+                     **mesure(fn, repeat)}
+                print(f"{scale:>5}x  {nom:<20} {nom_sel:<8} {r['median_ms']:>10.1f} ms",
+                      file=sys.stderr)
+                resultats.append(r)
+    return resultats, divergences
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Parité et performances des moteurs pandas et DuckDB.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--parite", type=int, default=20, help="sélections aléatoires vérifiées")
+    parser.add_argument("--out", help="fichier JSON des mesures")
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore")
+
+    resultats, divergences = [], {}
+    for scale in args.scales:
+        mesures, ecart = bench_scale(scale, args.repeat, args.parite)
+        resultats += mesures
+        divergences.update({f"{scale}x/{nom}": d for nom, d in ecart.items()})
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"results": resultats, "divergences": divergences}, f, indent=2)
+
+    for nom, d in divergences.items():
+        print(f"DIVERGENCE {nom} : {', '.join(d)}")
+    print("Parité cube / DuckDB : " + ("ÉCHEC" if divergences else "OK"), file=sys.stderr)
+    sys.exit(1 if divergences else 0)
+
+
+if __name__ == "__main__":
+    main()
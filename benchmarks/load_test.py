@@ -0,0 +1,154 @@
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+from streamlit import logger
+from streamlit.testing.v1 import AppTest
+
+# À lancer depuis la racine du dépôt (les pages y lisent app/assets)
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = [os.path.join(RACINE, "pages", "hote.py"), os.path.join(RACINE, "pages", "voyageur.py")]
+# Plages de prix choisies au hasard à chaque interaction (chacune relance toute la page)
+PLAGES_PRIX = [(50, 200), (0, 1000), (80, 150), (100, 400), (30, 120)]
+TIMEOUT = 600
+# AppTest n'est pas réentrant (il installe un Runtime global le temps d'une exécution) : les
+# sessions vivent en parallèle, mais leurs exécutions passent l'une après l'autre, comme
+# sur un serveur saturé où le GIL sérialise l'essentiel du travail des scripts.
+_VERROU = threading.Lock()
+
+
+def memoire_mo():
+    """Mémoire résidente du processus, en Mo (pic si /proc n'est pas disponible)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _prix(at):
+    return next(s for s in at.sidebar.slider if s.label == "Prix (€)")
+
+
+def _executer(at, page):
+    """Exécute la session ; renvoie (attente du tour, durée d'exécution) en secondes."""
+    demande = time.perf_counter()
+    with _VERROU:
+        debut = time.perf_counter()
+        at.run()
+        fin = time.perf_counter()
+    if at.exception:
+        raise RuntimeError(f"{page} : {at.exception[0].value}")
+    return debut - demande, fin - debut
+
+
+def session(page, reruns, seed, latences, sessions, pret, depart):
+    """Une session simulée : premier rendu, puis `reruns` changements de plage de prix."""
+    at = AppTest.from_file(page, default_timeout=TIMEOUT)
+    _executer(at, page)
+    sessions.append(at)  # gardée en vie jusqu'à la fin : sa mémoire reste comptée
+    pret.wait()
+    depart.wait()
+    rng = random.Random(seed)
+    for _ in range(reruns):
+        _prix(at).set_value(rng.choice(PLAGES_PRIX))
+        latences.append((page, *_executer(at, page)))
+
+
+def load_test(n_sessions, reruns, seed=0):
+    """`n_sessions` sessions simultanées, réparties sur les pages, dans un seul processus.
+
+    La mémoire par session est l'augmentation de la mémoire résidente une fois toutes les
+    sessions ouvertes, rapportée au nombre de sessions, après une session de chauffe qui
+    charge les données et index partagés.
+    """
+    for page in PAGES:
+        AppTest.from_file(page, default_timeout=TIMEOUT).run()
+    gc.collect()
+    avant = memoire_mo()
+
+    latences, sessions, erreurs = [], [], []
+    pret, depart = threading.Barrier(n_sessions + 1), threading.Barrier(n_sessions + 1)
+
+    def executer(i):
+        try:
+            session(PAGES[i % len(PAGES)], reruns, seed + i, latences, sessions, pret, depart)
+        except Exception as exc:  # noqa: BLE001 (remontée après la mesure)
+            erreurs.append(exc)
+            pret.abort()
+            depart.abort()
+
+    threads = [threading.Thread(target=executer, args=(i,)) for i in range(n_sessions)]
+    for t in threads:
+        t.start()
+    try:
+        pret.wait()
+        gc.collect()
+        ouvertes = memoire_mo()
+        debut = time.perf_counter()
+        depart.wait()
+    except threading.BrokenBarrierError:
+        pass
+    for t in threads:
+        t.join()
+    if erreurs:
+        raise erreurs[0]
+    duree = time.perf_counter() - debut
+
+    resultat = {
+        "sessions": n_sessions, "reruns": reruns,
+        "memoire_base_mo": round(avant, 1),
+        "memoire_par_session_mo": round((ouvertes - avant) / n_sessions, 2),
+        "memoire_fin_mo": round(memoire_mo(), 1),
+        "reruns_par_s": round(len(latences) / duree, 2),
+    }
+    for page in [None] + PAGES:
+        mesures = np.array([(a, d) for p, a, d in latences if page in (None, p)]).reshape(-1, 2)
+        if not len(mesures):
+            continue
+        nom = "tous" if page is None else os.path.splitext(os.path.basename(page))[0]
+        execution, percue = 1000 * mesures[:, 1], 1000 * mesures.sum(axis=1)
+        resultat[nom] = {
+            "n": len(mesures),
+            "execution_p50_ms": round(float(np.percentile(execution, 50)), 1),
+            "execution_p95_ms": round(float(np.percentile(execution, 95)), 1),
+            "percue_p50_ms": round(float(np.percentile(percue, 50)), 1),
+            "percue_p95_ms": round(float(np.percentile(percue, 95)), 1),
+        }
+    return resultat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Test de charge : sessions simultanées simulées (AppTest) sur les pages.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--reruns", type=int, default=5, help="interactions par session")
+    parser.add_argument("--out", help="fichier JSON des résultats")
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore")
+    logger.set_log_level("error")
+
+    resultats = []
+    for n in args.sessions:
+        r = load_test(n, args.reruns)
+        tous = r["tous"]
+        print(f"{n:>4} sessions  {r['memoire_par_session_mo']:>7.2f} Mo/session  "
+              f"exécution p50 {tous['execution_p50_ms']:>7.1f} / p95 {tous['execution_p95_ms']:>7.1f} ms  "
+              f"perçue p50 {tous['percue_p50_ms']:>8.1f} / p95 {tous['percue_p95_ms']:>8.1f} ms  "
+              f"{r['reruns_par_s']:.1f} reruns/s", file=sys.stderr)
+        resultats.append(r)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(resultats, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
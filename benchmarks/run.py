@@ -0,0 +1,274 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from app.components import charts, figures, maps
+from app.utils.analytics import detect_bons_plans
+from app.utils.anomalies import PriceAnomalies
+from app.utils.clusters import ClusterIndex
+from app.utils.context import SelectionContext
+from app.utils.cube import StatsCube
+from app.utils.filters import apply_filters
+from app.utils.hexgrid import ZOOM_POINTS, HexGrid
+from app.utils.index import FilterIndex
+from app.utils.load import coerce_types, split_listings
+from app.utils.neighbors import NeighborIndex, haversine_km
+from app.utils.pricing import PriceModel
+from app.utils.seasonality import SeasonalIndex
+from benchmarks import synthetic
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Au-delà, le format long (une ligne par annonce et par mois) ne tient plus en mémoire
+MAX_LIGNES_LONGUES = 3_000_000
+
+SHOW = {
+    "hote": ["show_kpi_block", "show_automatic_reco_table", "show_tarif_suggestion",
+             "show_room_type_pie",
+             "show_price_distribution", "show_availability_vs_reviews",
+             "show_price_summary_bar", "show_quartier_comparison", "show_price_boxplot",
+             "show_seasonality_heatmap", "show_seasonality_trend", "show_peak_offpeak"],
+    "voyageur": ["show_kpi_block_voyageur", "show_bons_plans_table", "show_boxplot_quartiers",
+                 "show_summary_bar_chart", "show_seasonality_bar", "show_top_deals_score",
+                 "show_seasonality_heatmap", "show_seasonality_trend", "show_peak_offpeak"],
+}
+
+TABLES = ["show_automatic_reco_table", "show_tarif_suggestion", "show_bons_plans_table"]
+
+
+class StreamlitStub:
+    """Remplace streamlit pendant les mesures : tout appel ou bloc `with` est absorbé.
+
+    st.plotly_chart et st.dataframe sérialisent quand même la figure ou la table (en
+    Arrow), comme le ferait Streamlit, pour que la mesure inclue le coût d'envoi au
+    navigateur.
+    """
+
+    def __init__(self):
+        self.session_state = {}
+        self.sidebar = self
+
+    def __getattr__(self, name):
+        return self._absorbe
+
+    def _absorbe(self, *args, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def columns(self, spec, **kwargs):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    def multiselect(self, label, options, default=None, **kwargs):
+        return list(default or [])
+
+    def radio(self, label, options, index=0, **kwargs):
+        return list(options)[index]
+
+    selectbox = radio
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return value if value is not None else min_value
+
+    def plotly_chart(self, fig, **kwargs):
+        fig.to_json()
+
+    def dataframe(self, data, **kwargs):
+        table = pa.Table.from_pandas(data)
+        with pa.ipc.new_stream(pa.BufferOutputStream(), table.schema) as flux:
+            flux.write_table(table)
+
+
+def selections(df):
+    """Sélection par défaut des pages (3 quartiers, 50-200 €) et Paris entier."""
+    quartiers = sorted(df["neighbourhood_cleansed"].unique())
+    types = sorted(df["room_type"].unique())
+    return {
+        "defaut": (quartiers[:3], types, (50, 200)),
+        "paris": (quartiers, types, (0, 1000)),
+    }
+
+
+def mesure(fn, repeat):
+    durees = []
+    for _ in range(repeat):
+        debut = time.perf_counter()
+        fn()
+        durees.append(time.perf_counter() - debut)
+    return {"median_ms": round(1000 * float(np.median(durees)), 3),
+            "min_ms": round(1000 * min(durees), 3), "repeat": repeat}
+
+
+def scan_voisins(df, position, k, rayon_km):
+    """Plus proches voisins sans index : distance de l'annonce `position` à toutes les autres."""
+    ref = df.iloc[position]
+    distances = haversine_km(ref["latitude"], ref["longitude"],
+                             df["latitude"].to_numpy(), df["longitude"].to_numpy())
+    distances[(df["room_type"] != ref["room_type"]).to_numpy() | (distances > rayon_km)] = np.inf
+    distances[position] = np.inf
+    proches = np.argpartition(distances, k)[:k]
+    return proches[np.isfinite(distances[proches])]
+
+
+def bench_scale(scale, repeat, seed=0):
+    """Mesures d'une échelle : [(nom, sélection, fonction), ...] exécutées `repeat` fois."""
+    df, saison = synthetic.listings(scale, seed)
+    cas = []
+    if len(df) * len(saison.mois) <= MAX_LIGNES_LONGUES:
+        long = synthetic.enriched(scale, seed)
+        cas.append(("split_listings", None, lambda: split_listings(coerce_types(long.copy()))))
+
+    index, cube, clusters, grille = FilterIndex(df), StatsCube(df), ClusterIndex(df), HexGrid(df)
+    anomalies, voisins, modele_prix = PriceAnomalies(df), NeighborIndex(df), PriceModel(df)
+    saisonnier = SeasonalIndex(df, saison)
+    cas += [
+        ("build.filter_index", None, lambda: FilterIndex(df)),
+        ("build.stats_cube", None, lambda: StatsCube(df)),
+        ("build.cluster_index", None, lambda: ClusterIndex(df)),
+        ("build.hex_grid", None, lambda: HexGrid(df)),
+        ("build.price_anomalies", None, lambda: PriceAnomalies(df)),
+        ("build.neighbor_index", None, lambda: NeighborIndex(df)),
+        ("build.price_model", None, lambda: PriceModel(df)),
+        ("build.seasonal_index", None, lambda: SeasonalIndex(df, saison)),
+        ("price_model.predict", None, lambda: modele_prix.predict(df)),
+    ]
+
+    # 10 plus proches annonces du même type que la première, dans un rayon d'1 km : par
+    # l'index spatial, et par calcul de la distance à toute la table pour comparaison
+    ref = df.iloc[0]
+    cas += [
+        ("neighbors.index", None,
+         lambda: voisins.nearest(ref["latitude"], ref["longitude"], ref["room_type"], 10, 1.0, 0)),
+        ("neighbors.scan", None, lambda: scan_voisins(df, 0, 10, 1.0)),
+    ]
+
+    stub = StreamlitStub()
+    charts.st = maps.st = stub
+    maps.st_folium = lambda carte, **kwargs: carte.get_root().render()
+    maps.get_cluster_index = lambda snapshot=None: clusters
+    maps.get_hex_grid = lambda snapshot=None: grille
+
+    def indexe(sel):
+        index._select.cache_clear()
+        return apply_filters(df, *sel, index=index)
+
+    def page(noms, filtre, sel):
+        def executer():
+            figures._cache.clear()
+            # Un contexte par exécution, partagé par les graphiques comme dans les pages
+            ctx = SelectionContext(filtre, df, stats=cube.query(*sel), saison=saisonnier,
+                                   anomalies=anomalies, modele_prix=modele_prix)
+            for nom in noms:
+                getattr(charts, nom)(ctx)
+        return executer
+
+    for nom_sel, sel in selections(df).items():
+        filtre = apply_filters(df, *sel, index=index)
+        cas += [
+            ("apply_filters.masques", nom_sel, lambda sel=sel: apply_filters(df, *sel)),
+            ("apply_filters.index", nom_sel, lambda sel=sel: indexe(sel)),
+            ("cube.query", nom_sel, lambda sel=sel: cube.query(*sel)),
+            ("detect_bons_plans", nom_sel, lambda f=filtre: detect_bons_plans(f)),
+            ("seasonal_index.query", nom_sel,
+             lambda f=filtre: saisonnier.query(f.index.to_numpy())),
+            ("hex_grid.cells", nom_sel, lambda f=filtre: grille.cells(f.index.to_numpy(), 12)),
+            # Zoom par défaut des pages (grille de densité), puis vue rapprochée (annonces)
+            ("render_fast_marker_map", nom_sel,
+             lambda f=filtre: (stub.session_state.clear(), maps.render_fast_marker_map(f))),
+            ("render_fast_marker_map.points", nom_sel,
+             lambda f=filtre: (stub.session_state.clear(),
+                               maps.render_fast_marker_map(f, zoom=ZOOM_POINTS))),
+        ]
+        # Changement de page d'un tableau : le fragment relit le contexte partagé
+        contexte = SelectionContext(filtre, df, stats=cube.query(*sel), saison=saisonnier,
+                                    anomalies=anomalies, modele_prix=modele_prix)
+        for nom in TABLES:
+            cas.append((f"rerun.{nom}", nom_sel, lambda nom=nom, c=contexte: getattr(charts, nom)(c)))
+        for vue, noms in SHOW.items():
+            for nom in noms:
+                cas.append((f"charts.{nom}", nom_sel,
+                            page([nom], filtre, sel)))
+            cas.append((f"page.{vue}", nom_sel, page(noms, filtre, sel)))
+
+    resultats = []
+    for nom, nom_sel, fn in cas:
+        resultat = {"bench": nom, "scale": scale, "annonces": len(df), "selection": nom_sel,
+                    **mesure(fn, repeat)}
+        print(f"{scale:>5}x  {nom:<45} {nom_sel or '':<8} {resultat['median_ms']:>10.1f} ms",
+              file=sys.stderr)
+        resultats.append(resultat)
+    return resultats
+
+
+def _version():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnue"
+
+
+def compare(base, courant, seuil=1.2):
+    """Mesures de `courant` plus lentes que `base` d'un facteur supérieur à `seuil`."""
+    def cle(r):
+        return r["bench"], r["scale"], r["selection"]
+    reference = {cle(r): r for r in base["results"]}
+    regressions = []
+    for r in courant["results"]:
+        avant = reference.get(cle(r))
+        if avant and avant["median_ms"] > 0 and r["median_ms"] / avant["median_ms"] > seuil:
+            regressions.append({**r, "avant_ms": avant["median_ms"],
+                                "ratio": round(r["median_ms"] / avant["median_ms"], 2)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks du dashboard sur données synthétiques.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10],
+                        help="multiples de Paris (100 demande plusieurs Go de mémoire)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="fichier JSON (défaut : benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="résultats de référence à comparer")
+    parser.add_argument("--seuil", type=float, default=1.2, help="ratio signalé comme régression")
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore")
+
+    version = _version()
+    resultats = {
+        "meta": {
+            "version": version, "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "pandas": pd.__version__,
+            "numpy": np.__version__, "machine": platform.machine(),
+        },
+        "results": [r for scale in args.scales for r in bench_scale(scale, args.repeat)],
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{version}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(resultats, f, indent=2)
+    print(f"Résultats écrits dans {out}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), resultats, args.seuil)
+        for r in regressions:
+            print(f"RÉGRESSION {r['bench']} ({r['scale']}x, {r['selection']}) : "
+                  f"{r['avant_ms']:.1f} -> {r['median_ms']:.1f} ms (x{r['ratio']})")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+# À lancer depuis la racine du dépôt (les pages y lisent app/assets)
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["Home.py", os.path.join("pages", "hote.py"), os.path.join("pages", "voyageur.py")]
+# sans : premier visiteur sans préchargement (preload=0) ; demarrage : il arrive en même
+# temps que le serveur démarre, préchargement en cours ; prechauffe : après le préchargement
+MODES = ["sans", "demarrage", "prechauffe"]
+TIMEOUT = 900
+
+
+def mesure(page, mode):
+    """Premier rendu de `page` dans ce processus neuf : secondes jusqu'à la fin de
+    l'exécution du script (tous les éléments envoyés, page interactive), selon `mode`."""
+    from streamlit import logger
+    from streamlit.testing.v1 import AppTest
+    from app.utils.warmup import MODULES, start_warmup
+
+    warnings.simplefilter("ignore")
+    logger.set_log_level("error")
+    preparation = None
+    if mode != "sans":
+        warmup = start_warmup()
+        if mode == "prechauffe":
+            warmup.join()
+            preparation = warmup.duree()
+    at = AppTest.from_file(os.path.join(RACINE, page), default_timeout=TIMEOUT)
+    deja = set(sys.modules)
+    debut = time.perf_counter()
+    at.run()
+    ttfi = time.perf_counter() - debut
+    if at.exception:
+        raise RuntimeError(f"{page} : {at.exception[0].value}")
+    return {
+        "ttfi_s": round(ttfi, 3),
+        "preparation_s": None if preparation is None else round(preparation, 3),
+        # Modules lourds importés par le rendu lui-même (streamlit importe déjà
+        # plotly.graph_objects pour st.plotly_chart)
+        "modules_importes": [nom for nom in MODULES if nom in sys.modules and nom not in deja],
+    }
+
+
+def startup(pages=PAGES, modes=MODES, repeat=3, froid=False):
+    """Temps jusqu'au premier rendu interactif de chaque page, chaque mesure dans un
+    processus neuf (imports et caches en mémoire froids, comme au premier visiteur après
+    un déploiement) ; médiane de `repeat` mesures.
+
+    Avec `froid`, chaque mesure part aussi d'un cache_dir et d'un bundle_path vides :
+    la source est relue et analysée, les index construits à chaud, comme sur une instance
+    sans artefacts précalculés.
+    """
+    resultats = []
+    for page in pages:
+        for mode in modes:
+            chemin = os.pathsep.join(filter(None, [RACINE, os.environ.get("PYTHONPATH")]))
+            env = dict(os.environ, preload="0" if mode == "sans" else "1", PYTHONPATH=chemin)
+            mesures = []
+            for _ in range(repeat):
+                if froid:
+                    vide = tempfile.mkdtemp(prefix="startup-")
+                    env["cache_dir"] = os.path.join(vide, "cache")
+                    env["bundle_path"] = os.path.join(vide, "artifacts")
+                try:
+                    sortie = subprocess.run(
+                        [sys.executable, "-m", "benchmarks.startup", "--mesure", page, mode],
+                        cwd=RACINE, env=env, capture_output=True, text=True, check=True,
+                    )
+                finally:
+                    if froid:
+                        shutil.rmtree(vide, ignore_errors=True)
+                mesures.append(json.loads(sortie.stdout.strip().splitlines()[-1]))
+            preparations = [m["preparation_s"] for m in mesures if m["preparation_s"] is not None]
+            resultats.append({
+                "page": page, "mode": mode, "repeat": repeat, "froid": froid,
+                "ttfi_s": round(statistics.median(m["ttfi_s"] for m in mesures), 3),
+                "preparation_s": round(statistics.median(preparations), 3) if preparations else None,
+                "modules_importes": mesures[-1]["modules_importes"],
+            })
+    return resultats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Temps jusqu'au premier rendu interactif (Home.py et pages), processus neufs.")
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--froid", action="store_true",
+                        help="cache_dir et bundle_path vides pour chaque mesure")
+    parser.add_argument("--out", help="fichier JSON des résultats")
+    parser.add_argument("--mesure", nargs=2, metavar=("PAGE", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.mesure:
+        print(json.dumps(mesure(*args.mesure)))
+        return
+
+    resultats = startup(args.pages, args.modes, args.repeat, args.froid)
+    for r in resultats:
+        preparation = "" if r["preparation_s"] is None else \
+            f"  (préparation {r['preparation_s']:.2f} s)"
+        modules = ", ".join(r["modules_importes"]) or "aucun"
+        print(f"{r['page']:<20} {r['mode']:<11} {r['ttfi_s']:>7.2f} s{preparation}  "
+              f"modules importés au rendu : {modules}", file=sys.stderr)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(resultats, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
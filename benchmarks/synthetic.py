@@ -0,0 +1,74 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from app.utils.load import Saisonnalite
+
+# Ordre de grandeur du fichier enrichi de Paris (annonces distinctes)
+ANNONCES_PARIS = 20_000
+
+QUARTIERS = [
+    "Louvre", "Bourse", "Temple", "Hôtel-de-Ville", "Panthéon", "Luxembourg",
+    "Palais-Bourbon", "Élysée", "Opéra", "Entrepôt", "Popincourt", "Reuilly", "Gobelins",
+    "Observatoire", "Vaugirard", "Passy", "Batignolles-Monceau", "Buttes-Montmartre",
+    "Buttes-Chaumont", "Ménilmontant",
+]
+TYPES = ["Entire home/apt", "Private room", "Hotel room", "Shared room"]
+PART_TYPES = [0.80, 0.15, 0.03, 0.02]
+MOIS = [f"2025-{m:02d}" for m in range(4, 13)] + [f"2026-{m:02d}" for m in range(1, 4)]
+
+
+def listings(scale=1.0, seed=0):
+    """(annonces, saisonnalité) synthétiques, au format renvoyé par split_listings.
+
+    `scale` multiplie le nombre d'annonces de Paris. Les distributions imitent le fichier
+    réel : prix log-normaux, avis très asymétriques, arrondissements groupés sur la carte
+    et environ 5 % de mois manquants dans la matrice de saisonnalité.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(ANNONCES_PARIS * scale)
+    q = rng.integers(0, len(QUARTIERS), n)
+    df = pd.DataFrame({
+        "id": np.arange(n, dtype=np.int64) * 7 + 1000,
+        "name": [f"Logement {i}" for i in range(n)],
+        "listing_url": [f"https://www.airbnb.com/rooms/{i}" for i in range(n)],
+        "neighbourhood_cleansed": np.array(QUARTIERS)[q],
+        "room_type": np.array(TYPES)[rng.choice(len(TYPES), n, p=PART_TYPES)],
+        "price": np.round(rng.lognormal(4.8, 0.6, n)),
+        "availability_365": rng.integers(0, 366, n),
+        "number_of_reviews": rng.negative_binomial(1, 0.03, n),
+        "reviews_per_month": np.where(rng.random(n) < 0.2, np.nan,
+                                      rng.gamma(1, 1, n).round(2)),
+        "latitude": 48.8566 + (q - 10) * 0.003 + rng.normal(0, 0.015, n),
+        "longitude": 2.3522 + rng.normal(0, 0.03, n),
+    })
+
+    df.attrs["version"] = f"synthetique-{scale}-{seed}"  # comme load_data
+
+    dispos = rng.integers(0, 31, (n, len(MOIS)), dtype=np.int16)
+    dispos[rng.random(dispos.shape) < 0.05] = -1
+    return df, Saisonnalite(np.array(MOIS), dispos)
+
+
+def enriched(scale=1.0, seed=0):
+    """Fichier enrichi synthétique : une ligne par annonce et par mois disponible."""
+    df, saison = listings(scale, seed)
+    presents = saison.dispos >= 0
+    lignes, mois = np.nonzero(presents)
+    long = df.take(lignes).reset_index(drop=True)
+    long["month"] = saison.mois[mois]
+    long["nb_jours_dispos"] = saison.dispos[presents]
+    return long
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fichier enrichi synthétique.")
+    parser.add_argument("out", help="chemin du CSV produit")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiple de Paris")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    enriched(args.scale, args.seed).to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
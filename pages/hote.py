@@ -1,6 +1,13 @@
 import streamlit as st
-from app.utils.load import load_data, load_css
-from app.utils.filters import apply_filters, render_sidebar_filters
+from app.utils.load import (
+    list_snapshots, load_css, load_data, load_price_evolution, load_seasonality
+)
+from app.utils.filters import (
+    apply_filters, current_selection, current_user, get_filter_index, get_neighbor_index,
+    get_price_anomalies, get_price_model, get_stats_cube, render_sidebar_filters,
+    render_snapshot_selector, share_selection
+)
+from app.utils.context import SelectionContext
 from app.components.charts import (
     show_kpi_block,
     show_quartier_comparison,
@@ -9,14 +16,23 @@ from app.components.charts import (
     show_room_type_pie,
     show_price_boxplot,
     show_price_summary_bar,
-    show_automatic_reco_table
+    show_automatic_reco_table,
+    show_nearest_comparables,
+    show_selection_export,
+    show_tarif_suggestion,
+    show_price_evolution,
+    show_seasonality_heatmap,
+    show_seasonality_trend,
+    show_peak_offpeak
 )
 from app.components.maps import render_fast_marker_map
+from app.utils.profiling import start_profile
 
 # ----------- Setup ----------- #
 st.set_page_config(page_title="Vue Hôte / Collectivité", layout="wide")
+profil = start_profile("hote")
 st.markdown(load_css("app/assets/styles.css"), unsafe_allow_html=True)
-df = load_data()
+current_user()  # jeton des favoris remis dans l'URL après un changement de page
 
 st.sidebar.header("Changer de 🎨 Thème, dans les paramètres (en Haut a droite)")
 
@@ -30,9 +46,11 @@ Elle est structurée autour de plusieurs éléments clés :
 <ul>
   <li>📌 Des <strong>indicateurs clés</strong> pour situer votre positionnement</li>
   <li>🗺️ Une <strong>carte</strong> des annonces concurrentes</li>
+  <li>📍 Vos <strong>concurrents les plus proches</strong> et leurs prix</li>
   <li>🧠 Un tableau de <strong>recommandations automatiques</strong> pour ajuster vos tarifs</li>
   <li>📊 Des <strong>graphiques analytiques</strong> comparant quartiers, prix, disponibilités</li>
   <li>💡 Une <strong>détection des tarifs à revoir</strong> via une analyse statistique</li>
+  <li>🗓️ La <strong>saisonnalité de l’occupation</strong> par quartier, sa tendance et la haute/basse saison</li>
 </ul>
 
 ℹ️ <em>Pensez à survoler les icônes</em> <span style='background:#eee; padding:0.1em 0.3em;
@@ -42,34 +60,123 @@ tableau</em>.
 """, unsafe_allow_html=True)
 
 # ----------- Filtres ----------- #
-selected_neigh, selected_types, selected_price = render_sidebar_filters(df, default_quartiers=3)
-filtered_df = apply_filters(df, selected_neigh, selected_types, selected_price)
+with profil.section("chargement") as mesure:
+    snapshot = render_snapshot_selector()
+    df = load_data(snapshot)
+    mesure["lignes"] = len(df)
+with profil.section("filtres", len(df)):
+    selected_neigh, selected_types, selected_price = render_sidebar_filters(df,
+                                                                            default_quartiers=3)
+    filtered_df = apply_filters(df, selected_neigh, selected_types, selected_price,
+                                index=get_filter_index(snapshot))
+    stats = get_stats_cube(snapshot).query(selected_neigh, selected_types, selected_price)
+    ctx = share_selection(SelectionContext(filtered_df, df, stats=stats,
+                                           saison=load_seasonality(snapshot),
+                                           anomalies=get_price_anomalies(snapshot),
+                                           modele_prix=get_price_model(snapshot)))
+
+# Chaque bloc est un fragment : une interaction (déplacement de la carte...) ne relance que
+# son fragment, qui relit la sélection partagée ; un changement de filtre relance la page.
+
 
 # ----------- KPIs concurrentiels ----------- #
-show_kpi_block(filtered_df, df)
+@profil.fragment("kpi", len(ctx))
+def kpi():
+    show_kpi_block(current_selection())
+
 
 # ----------- Carte des concurrents ----------- #
-st.subheader("🗺️ Localisation des concurrents selon vos filtres")
-render_fast_marker_map(filtered_df)
+@profil.fragment("carte", len(ctx))
+def carte(snapshot):
+    st.subheader("🗺️ Localisation des concurrents selon vos filtres")
+    render_fast_marker_map(current_selection().df, snapshot=snapshot)
+
+
+# ----------- Concurrents les plus proches ----------- #
+@profil.fragment("concurrents_proches", len(ctx))
+def concurrents_proches(snapshot):
+    show_nearest_comparables(current_selection(), get_neighbor_index(snapshot))
+
 
 # ----------- Recommandations automatiques ----------- #
-show_automatic_reco_table(filtered_df)
+@profil.fragment("recommandations", len(ctx))
+def recommandations():
+    show_automatic_reco_table(current_selection())
+
+
+# ----------- Tarifs atypiques ----------- #
+@profil.fragment("tarifs_atypiques", len(ctx))
+def tarifs_atypiques():
+    show_tarif_suggestion(current_selection())
+
 
 # ----------- Graphiques analytiques (2 par 2) ----------- #
-col1, col2 = st.columns(2)
-with col1:
-    show_room_type_pie(filtered_df)
-with col2:
-    show_price_distribution(filtered_df)
-
-col3, col4 = st.columns(2)
-with col3:
-    show_availability_vs_reviews(filtered_df)
-with col4:
-    show_price_summary_bar(filtered_df)
-
-col5, col6 = st.columns(2)
-with col5:
-    show_quartier_comparison(filtered_df)
-with col6:
-    show_price_boxplot(filtered_df)
+@profil.fragment("graphiques_types_prix", len(ctx))
+def graphiques_types_prix():
+    ctx = current_selection()
+    col1, col2 = st.columns(2)
+    with col1:
+        show_room_type_pie(ctx)
+    with col2:
+        show_price_distribution(ctx)
+
+
+@profil.fragment("graphiques_reviews_quartiers", len(ctx))
+def graphiques_reviews_quartiers():
+    ctx = current_selection()
+    col3, col4 = st.columns(2)
+    with col3:
+        show_availability_vs_reviews(ctx)
+    with col4:
+        show_price_summary_bar(ctx)
+
+
+@profil.fragment("graphiques_comparaison_boxplot", len(ctx))
+def graphiques_comparaison_boxplot():
+    ctx = current_selection()
+    col5, col6 = st.columns(2)
+    with col5:
+        show_quartier_comparison(ctx)
+    with col6:
+        show_price_boxplot(ctx)
+
+
+# ----------- Occupation saisonnière ----------- #
+@profil.fragment("saisonnalite", len(ctx))
+def saisonnalite():
+    ctx = current_selection()
+    show_seasonality_heatmap(ctx)
+    col7, col8 = st.columns(2)
+    with col7:
+        show_seasonality_trend(ctx)
+    with col8:
+        show_peak_offpeak(ctx)
+
+
+# ----------- Évolution entre snapshots ----------- #
+@profil.fragment("evolution_prix", len(ctx))
+def evolution_prix():
+    snapshots = list_snapshots()
+    if len(snapshots) >= 2:
+        show_price_evolution(current_selection(), load_price_evolution(tuple(snapshots)))
+
+
+# ----------- Export de la sélection ----------- #
+@profil.fragment("export", len(ctx))
+def export():
+    show_selection_export(current_selection())
+
+
+kpi()
+carte(snapshot)
+concurrents_proches(snapshot)
+recommandations()
+tarifs_atypiques()
+graphiques_types_prix()
+graphiques_reviews_quartiers()
+graphiques_comparaison_boxplot()
+saisonnalite()
+evolution_prix()
+export()
+
+profil.finish()
@@ -1,21 +1,31 @@
 import streamlit as st
-import pandas as pd
-from app.utils.load import load_data, load_css
-from app.utils.filters import render_sidebar_filters, apply_filters, detect_bons_plans
+from app.utils.load import load_data, load_seasonality, load_css
+from app.utils.filters import (
+    render_sidebar_filters, render_snapshot_selector, apply_filters, get_filter_index,
+    get_stats_cube, current_selection, share_selection, current_user
+)
+from app.utils.context import SelectionContext
 from app.components.maps import render_fast_marker_map
+from app.utils.profiling import start_profile
 from app.components.charts import (
     show_boxplot_quartiers,
     show_summary_bar_chart,
     show_top_deals_score,
     show_kpi_block_voyageur,
     show_seasonality_bar,
-    show_bons_plans_table
+    show_bons_plans_table,
+    show_favorites,
+    show_selection_export,
+    show_seasonality_heatmap,
+    show_seasonality_trend,
+    show_peak_offpeak
 )
 
 # ----------- Setup ----------- #
 st.set_page_config(page_title="Vue Voyageur", layout="wide")
+profil = start_profile("voyageur")
 st.markdown(load_css("app/assets/styles.css"), unsafe_allow_html=True)
-df = load_data()
+current_user()  # jeton des favoris remis dans l'URL après un changement de page
 
 st.title("🎒 Vue Voyageur – Rechercher un logement à Paris")
 st.markdown("""
@@ -40,47 +50,91 @@ détaillées sur chaque graphique ou tableau.
 """, unsafe_allow_html=True)
 
 # ----------- Filtres ----------- #
-selected_neigh, selected_types, selected_price = render_sidebar_filters(df, default_quartiers=3)
-filtered_df = apply_filters(df, selected_neigh, selected_types, selected_price)
+with profil.section("chargement") as mesure:
+    snapshot = render_snapshot_selector()
+    df = load_data(snapshot)
+    mesure["lignes"] = len(df)
+with profil.section("filtres", len(df)):
+    selected_neigh, selected_types, selected_price = render_sidebar_filters(df,
+                                                                            default_quartiers=3)
+    filtered_df = apply_filters(df, selected_neigh, selected_types, selected_price,
+                                index=get_filter_index(snapshot))
+    stats = get_stats_cube(snapshot).query(selected_neigh, selected_types, selected_price)
+    ctx = share_selection(SelectionContext(filtered_df, df, stats=stats,
+                                           saison=load_seasonality(snapshot)))
+
+# Chaque bloc est un fragment : une interaction (déplacement de la carte, ajout d'un favori)
+# ne relance que son fragment, qui relit la sélection partagée ; un changement de filtre
+# relance la page.
+
 
 # ----------- Bandeau KPIs ----------- #
-show_kpi_block_voyageur(filtered_df)
+@profil.fragment("kpi", len(ctx))
+def kpi():
+    show_kpi_block_voyageur(current_selection())
+
 
 # ----------- Carte interactive ----------- #
-st.subheader("📍 Logements disponibles selon vos filtres")
-render_fast_marker_map(filtered_df)
+@profil.fragment("carte", len(ctx))
+def carte(snapshot):
+    st.subheader("📍 Logements disponibles selon vos filtres")
+    render_fast_marker_map(current_selection().df, snapshot=snapshot)
 
-# ----------- Bons plans ----------- #
-bons_plans = detect_bons_plans(filtered_df)
-show_bons_plans_table(bons_plans)
 
-# Saison
+# ----------- Bons plans et favoris ----------- #
+@profil.fragment("bons_plans_favoris", len(ctx))
+def bons_plans_favoris():
+    ctx = current_selection()
+    show_bons_plans_table(ctx)
+    show_favorites(ctx)
+
 
 # ----------- Boxplot des prix par quartier ----------- #
-col1, col2 = st.columns(2)
-with col1:
-    show_boxplot_quartiers(filtered_df)
-with col2:
-    show_summary_bar_chart(filtered_df)
-
-col3, col4 = st.columns(2)
-with col3:
-    show_seasonality_bar(filtered_df)
-with col4:
-    show_top_deals_score(filtered_df)
-
-# ✅ Graphe des meilleurs rapports qualité/prix
-
-
-# ----------- Favoris (session_state) ----------- #
-st.subheader("🧺 Vos favoris")
-
-if st.session_state["shortlist"]:
-    favs_df = pd.DataFrame(st.session_state["shortlist"])
-    st.dataframe(
-        favs_df[["name", "neighbourhood_cleansed", "price", "availability_365",
-                 "number_of_reviews"]],
-        use_container_width=True
-    )
-else:
-    st.info("Aucun favori sélectionné pour le moment.")
+@profil.fragment("graphiques_prix", len(ctx))
+def graphiques_prix():
+    ctx = current_selection()
+    col1, col2 = st.columns(2)
+    with col1:
+        show_boxplot_quartiers(ctx)
+    with col2:
+        show_summary_bar_chart(ctx)
+
+
+# ----------- Saisonnalité et meilleurs rapports qualité/prix ----------- #
+@profil.fragment("graphiques_saison_qualite_prix", len(ctx))
+def graphiques_saison_qualite_prix():
+    ctx = current_selection()
+    col3, col4 = st.columns(2)
+    with col3:
+        show_seasonality_bar(ctx)
+    with col4:
+        show_top_deals_score(ctx)
+
+
+# ----------- Occupation saisonnière ----------- #
+@profil.fragment("saisonnalite", len(ctx))
+def saisonnalite():
+    ctx = current_selection()
+    show_seasonality_heatmap(ctx)
+    col5, col6 = st.columns(2)
+    with col5:
+        show_seasonality_trend(ctx)
+    with col6:
+        show_peak_offpeak(ctx)
+
+
+# ----------- Export de la sélection ----------- #
+@profil.fragment("export", len(ctx))
+def export():
+    show_selection_export(current_selection())
+
+
+kpi()
+carte(snapshot)
+bons_plans_favoris()
+graphiques_prix()
+graphiques_saison_qualite_prix()
+saisonnalite()
+export()
+
+profil.finish()
@@ -0,0 +1,28 @@
+from app.utils import analytics
+from app.utils.context import SelectionContext
+from benchmarks import synthetic
+
+
+def _contexte():
+    df, _ = synthetic.listings(0.05, seed=4)
+    return SelectionContext(df.take(range(0, len(df), 3)), df)
+
+
+def test_recherche_bornee():
+    ctx = _contexte()
+    positions, trouvees = analytics.search_listings(ctx, "")
+    assert trouvees == len(ctx) and len(positions) == analytics.MAX_RESULTATS_RECHERCHE
+    assert list(positions) == list(ctx.rows[:analytics.MAX_RESULTATS_RECHERCHE])
+
+
+def test_recherche_par_nom_et_par_id():
+    ctx = _contexte()
+    positions, trouvees = analytics.search_listings(ctx, "logement 30")
+    assert trouvees == len(positions) > 0
+    assert all("logement 30" in nom.lower() for nom in ctx.df_global["name"].iloc[positions])
+
+    annonce = ctx.df.iloc[5]
+    positions, trouvees = analytics.search_listings(ctx, f" {annonce['id']} ")
+    assert trouvees == 1 and positions[0] == ctx.rows[5]
+    # Une annonce hors de la sélection n'est pas proposée
+    assert analytics.search_listings(ctx, str(ctx.df_global["id"].iloc[1]))[1] == 0
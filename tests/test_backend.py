@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from app.utils.cube import StatsCube
+from app.utils.filters import apply_filters
+from app.utils.load import coerce_types
+from benchmarks import synthetic
+from benchmarks.backends import COLONNES, selections_parite
+
+pytest.importorskip("duckdb")
+from app.utils.backend import DuckDBBackend  # noqa: E402
+
+SELECTIONS = selections_parite(synthetic.listings(0.05, seed=3)[0], 10, seed=3)
+
+
+@pytest.fixture(scope="module")
+def annonces():
+    df, _ = synthetic.listings(0.05, seed=3)
+    df.loc[::30, "price"] = np.nan
+    return coerce_types(df)
+
+
+@pytest.fixture(scope="module", params=["parquet", "dataframe"])
+def moteur(request, annonces, tmp_path_factory):
+    if request.param == "dataframe":
+        return DuckDBBackend(annonces)
+    dossier = tmp_path_factory.mktemp("snapshot")
+    annonces.to_parquet(dossier / "listings.parquet", index=False)
+    return DuckDBBackend(str(dossier))
+
+
+@pytest.mark.parametrize("sel", SELECTIONS.values(), ids=SELECTIONS.keys())
+def test_select_egal_apply_filters(annonces, moteur, sel):
+    np.testing.assert_array_equal(moteur.select(*sel),
+                                  apply_filters(annonces, *sel).index.to_numpy())
+
+
+@pytest.mark.parametrize("sel", SELECTIONS.values(), ids=SELECTIONS.keys())
+def test_query_egal_cube(annonces, moteur, sel):
+    attendu, obtenu = StatsCube(annonces).query(*sel), moteur.query(*sel)
+    assert list(obtenu.par_quartier["neighbourhood_cleansed"]) == list(
+        attendu.par_quartier["neighbourhood_cleansed"])
+    for col in COLONNES:
+        np.testing.assert_allclose(obtenu.par_quartier[col].to_numpy(dtype=float),
+                                   attendu.par_quartier[col].to_numpy(dtype=float),
+                                   rtol=1e-9, err_msg=col)
+        np.testing.assert_allclose(obtenu.total[col], attendu.total[col], rtol=1e-9,
+                                   err_msg=col)
+    assert obtenu.prix_median_global == attendu.prix_median_global
@@ -0,0 +1,75 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from app import build
+from app.utils import load
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    chemin = tmp_path / "listings.csv"
+    rng = np.random.default_rng(6)
+    n, mois = 100, ["2025-04", "2025-05", "2025-06"]
+    annonces = pd.DataFrame({
+        "id": np.arange(n) * 7 + 1000, "name": [f"Logement {i}" for i in range(n)],
+        "neighbourhood_cleansed": rng.choice(["Louvre", "Opéra", "Temple"], n),
+        "room_type": rng.choice(["Entire home/apt", "Private room"], n),
+        "price": rng.uniform(30, 400, n).round(2),
+        "availability_365": rng.integers(0, 366, n),
+        "number_of_reviews": rng.integers(0, 200, n),
+        "reviews_per_month": rng.uniform(0, 5, n).round(2),
+        "latitude": rng.normal(48.86, 0.02, n), "longitude": rng.normal(2.35, 0.03, n),
+    })
+    # Format long du fichier enrichi : une ligne par annonce et par mois
+    long = annonces.loc[np.repeat(np.arange(n), len(mois))].assign(
+        month=mois * n, nb_jours_dispos=rng.integers(0, 31, n * len(mois)))
+    long.to_csv(chemin, index=False)
+    monkeypatch.setenv("data_path", str(chemin))
+    monkeypatch.setattr(load, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(load, "BUNDLE_DIR", str(tmp_path / "artifacts"))
+    load.bundle_dir.cache_clear()
+    yield chemin
+    load.bundle_dir.cache_clear()
+
+
+def _bundle():
+    load.bundle_dir.cache_clear()
+    return load.bundle_dir()
+
+
+def test_bundle_de_la_version_courante(source):
+    manifest = build.build(str(source), load.BUNDLE_DIR)
+    assert manifest["source_version"] == load._source_version(str(source))
+    assert _bundle() == os.path.join(load.BUNDLE_DIR, manifest["version"])
+
+
+def test_bundle_perime_ignore(source):
+    build.build(str(source), load.BUNDLE_DIR)
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert _bundle() is None
+
+
+def test_version_inconnue_non_verifiee(source, monkeypatch):
+    manifest = build.build(str(source), load.BUNDLE_DIR)
+    monkeypatch.setattr(load, "_source_version", lambda source: None)  # hors ligne
+    assert _bundle() == os.path.join(load.BUNDLE_DIR, manifest["version"])
+
+
+def test_autre_format_ignore(source):
+    manifest = build.build(str(source), load.BUNDLE_DIR)
+    chemin = os.path.join(load.BUNDLE_DIR, manifest["version"], "manifest.json")
+    with open(chemin, "w") as f:
+        json.dump({**manifest, "format": "0"}, f)
+    assert _bundle() is None
+
+
+def test_source_indisponible(tmp_path, capsys):
+    absente = str(tmp_path / "absente.csv")
+    with pytest.raises(build.SourceIndisponible):
+        build.build(absente, str(tmp_path / "artifacts"))
+    build.main(["--source", absente, "--out", str(tmp_path / "artifacts")])
+    assert "source indisponible" in capsys.readouterr().err
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils.cube import BINS_DISPO, BINS_REVIEWS, StatsCube
+from app.utils.filters import apply_filters
+from app.utils.load import read_listings, write_snapshot
+
+QUARTIERS = ["Batignolles-Monceau", "Bourse", "Louvre", "Opéra", "Popincourt", "Temple"]
+TYPES = ["Entire home/apt", "Hotel room", "Private room", "Shared room"]
+# Colonnes exactes du cube (prix entiers) ; les médianes des reviews et de la
+# disponibilité sont approchées à la largeur d'un bin près
+EXACTES = ["annonces", "prix_moyen", "prix_median", "prix_std", "prix_q1", "prix_q3",
+           "reviews_moyen", "dispo_moyenne"]
+SELECTIONS = {
+    "paris": (QUARTIERS, TYPES, (0, 1000)),
+    "defaut": (QUARTIERS[:3], TYPES[:1], (50, 200)),
+    "bornes": (QUARTIERS[2:5], TYPES[:3], (99, 101)),
+    "vide": ([], TYPES, (50, 200)),
+}
+
+
+@pytest.fixture(scope="module")
+def annonces(tmp_path_factory):
+    rng = np.random.default_rng(1)
+    n = 3000
+    # Prix au centime, comme dans le fichier source : le snapshot les arrondit à l'euro
+    prix = np.round(rng.lognormal(4.8, 0.6, n)) + rng.uniform(-0.49, 0.49, n)
+    prix[::50] += 0.5
+    df = pd.DataFrame({
+        "id": np.arange(n),
+        "neighbourhood_cleansed": rng.choice(QUARTIERS, n),
+        "room_type": rng.choice(TYPES, n, p=[0.8, 0.03, 0.15, 0.02]),
+        "price": prix.round(2),
+        "availability_365": rng.integers(0, 366, n),
+        "number_of_reviews": rng.negative_binomial(1, 0.03, n),
+    })
+    path = str(tmp_path_factory.mktemp("snapshot") / "courant")
+    write_snapshot(df, path)
+    return read_listings(path)
+
+
+def agregats(df):
+    def stats(groupe):
+        prix = groupe["price"]
+        return pd.DataFrame({
+            "annonces": prix.size(), "prix_moyen": prix.mean(), "prix_median": prix.median(),
+            "prix_std": prix.std(), "prix_q1": prix.quantile(0.25),
+            "prix_q3": prix.quantile(0.75),
+            "reviews_moyen": groupe["number_of_reviews"].mean(),
+            "reviews_median": groupe["number_of_reviews"].median(),
+            "dispo_moyenne": groupe["availability_365"].mean(),
+            "dispo_median": groupe["availability_365"].median(),
+        })
+    return (stats(df.groupby("neighbourhood_cleansed")).reset_index(),
+            stats(df.groupby(np.zeros(len(df)))).iloc[0] if len(df) else None)
+
+
+def largeur_bin(edges, valeurs):
+    i = np.clip(np.searchsorted(edges, valeurs, side="right") - 1, 0, len(edges) - 2)
+    haut = np.where(np.isfinite(edges[i + 1]), edges[i + 1], edges[i])
+    return haut - edges[i]
+
+
+@pytest.mark.parametrize("sel", SELECTIONS.values(), ids=SELECTIONS.keys())
+def test_cube_egal_pandas(annonces, sel):
+    attendu, total = agregats(apply_filters(annonces, *sel))
+    resultat = StatsCube(annonces).query(*sel)
+
+    obtenu = resultat.par_quartier
+    assert list(obtenu["neighbourhood_cleansed"]) == list(attendu["neighbourhood_cleansed"])
+    for col in EXACTES:
+        np.testing.assert_allclose(obtenu[col].to_numpy(dtype=float),
+                                   attendu[col].to_numpy(dtype=float), rtol=1e-9)
+    for col, edges, metrique in (("reviews_median", BINS_REVIEWS, "number_of_reviews"),
+                                 ("dispo_median", BINS_DISPO, "availability_365")):
+        ecart = np.abs(obtenu[col].to_numpy() - attendu[col].to_numpy())
+        assert (ecart <= largeur_bin(edges, attendu[col].to_numpy())).all(), col
+
+    if total is None:
+        assert resultat.total["annonces"] == 0
+        return
+    for col in EXACTES:
+        assert resultat.total[col] == pytest.approx(total[col], rel=1e-9)
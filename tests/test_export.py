@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils.export import export_frame
+from benchmarks import synthetic
+
+COLONNES = ["id", "name", "price", "reviews_per_month", "colonne_absente"]
+LECTEURS = {"csv": lambda f: pd.read_csv(f, encoding="utf-8-sig"), "parquet": pd.read_parquet}
+
+
+@pytest.fixture(scope="module")
+def annonces():
+    df, _ = synthetic.listings(0.01, seed=5)
+    df.loc[0, "name"] = 'Studio "Montmartre", vue; accents éàç'
+    return df
+
+
+@pytest.mark.parametrize("fmt", LECTEURS)
+@pytest.mark.parametrize("taille_bloc", [7, 100_000])
+def test_aller_retour(annonces, fmt, taille_bloc):
+    selection = annonces.take(np.arange(0, len(annonces), 3))
+    relu = LECTEURS[fmt](export_frame(selection, COLONNES, fmt, taille_bloc))
+    # Seules les colonnes demandées et présentes, dans l'ordre demandé
+    attendu = selection[COLONNES[:-1]].reset_index(drop=True)
+    pd.testing.assert_frame_equal(relu, attendu, check_dtype=False)
+
+
+@pytest.mark.parametrize("fmt", LECTEURS)
+def test_selection_vide(annonces, fmt):
+    relu = LECTEURS[fmt](export_frame(annonces.iloc[:0], COLONNES, fmt))
+    assert list(relu.columns) == COLONNES[:-1] and relu.empty
+
+
+def test_format_inconnu(annonces):
+    with pytest.raises(ValueError):
+        export_frame(annonces, COLONNES, "json")
@@ -0,0 +1,30 @@
+import pandas as pd
+from app.components.figures import cached_figure, selection_key
+from app.utils.context import SelectionContext
+
+
+def _jeu(version, prix):
+    df = pd.DataFrame({"price": prix})
+    df.attrs["version"] = version
+    return df
+
+
+def test_version_dans_la_cle():
+    courant, ancien = _jeu("courant", [80.0, 95.0, 120.0]), _jeu("2024-12", [70.0, 90.0, 60.0])
+    selections = [jeu.take([0, 2]) for jeu in (courant, ancien)]
+    # Les sélections gardent la version du jeu de données dont elles sont tirées
+    assert [sel.attrs["version"] for sel in selections] == ["courant", "2024-12"]
+    # Mêmes positions, jeux de données différents : deux empreintes, deux figures
+    assert selection_key(selections[0], "courant") != selection_key(selections[1], "2024-12")
+    figures = [cached_figure("test_prix", sel, lambda df: list(df["price"]),
+                             version=sel.attrs["version"]) for sel in selections]
+    assert figures == [[80.0, 120.0], [70.0, 60.0]]
+    # Même sélection du même jeu de données : la figure est réutilisée
+    assert cached_figure("test_prix", courant.take([0, 2]), lambda df: None,
+                         version="courant") is figures[0]
+
+
+def test_version_du_contexte():
+    jeu = _jeu("courant", [80.0, 95.0, 120.0])
+    assert SelectionContext(jeu.take([1]), jeu).version == "courant"
+    assert SelectionContext(jeu.take([1])).version is None
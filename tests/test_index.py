@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils.filters import apply_filters
+from app.utils.index import FilterIndex
+
+QUARTIERS = ["Batignolles-Monceau", "Bourse", "Louvre", "Opéra", "Popincourt", "Temple"]
+TYPES = ["Entire home/apt", "Hotel room", "Private room", "Shared room"]
+SELECTIONS = {
+    "paris": (QUARTIERS, TYPES, (0, 1000)),
+    "defaut": (QUARTIERS[:3], TYPES[:1], (50, 200)),
+    "un_quartier": (QUARTIERS[3:4], TYPES, (0, 1000)),
+    "prix_etroit": (QUARTIERS, TYPES[1:], (100, 100)),
+    "inconnus": (["Atlantide"], ["Igloo"], (0, 1000)),
+    "vide": ([], TYPES, (50, 200)),
+}
+
+
+@pytest.fixture(scope="module")
+def annonces():
+    rng = np.random.default_rng(2)
+    n = 3000
+    prix = np.round(rng.lognormal(4.8, 0.6, n))
+    prix[::40] = np.nan
+    return pd.DataFrame({
+        "neighbourhood_cleansed": rng.choice(QUARTIERS, n),
+        "room_type": rng.choice(TYPES, n, p=[0.8, 0.03, 0.15, 0.02]),
+        "price": prix,
+    })
+
+
+@pytest.mark.parametrize("sel", SELECTIONS.values(), ids=SELECTIONS.keys())
+def test_index_egal_apply_filters(annonces, sel):
+    index = FilterIndex(annonces)
+    attendu = apply_filters(annonces, *sel).index.to_numpy()
+    obtenu = index.select(*sel)
+    np.testing.assert_array_equal(obtenu, attendu)
+    # Deuxième appel : même résultat, servi par le cache et en lecture seule
+    assert index.select(*sel) is obtenu
+    assert not obtenu.flags.writeable
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils.shared import freeze
+
+ECRITURES = {
+    "setitem": lambda df: df.__setitem__("prix", 0),
+    "delitem": lambda df: df.__delitem__("prix"),
+    "attribut": lambda df: setattr(df, "prix", 0),
+    "loc": lambda df: df.loc.__setitem__((0, "prix"), 0),
+    "iloc": lambda df: df.iloc.__setitem__((0, 0), 0),
+    "at": lambda df: df.at.__setitem__((0, "prix"), 0),
+    "insert": lambda df: df.insert(0, "c", 1),
+    "pop": lambda df: df.pop("prix"),
+    "columns": lambda df: setattr(df, "columns", ["x", "y"]),
+    "index": lambda df: setattr(df, "index", [5, 6, 7]),
+    "reset_index": lambda df: df.reset_index(drop=True, inplace=True),
+    "set_index": lambda df: df.set_index("quartier", inplace=True),
+    "rename": lambda df: df.rename(columns={"prix": "p"}, inplace=True),
+    "rename_axis": lambda df: df.rename_axis("n", inplace=True),
+    "replace": lambda df: df.replace("Louvre", "Opéra", inplace=True),
+    "fillna": lambda df: df.fillna(0, inplace=True),
+    "dropna": lambda df: df.dropna(inplace=True),
+    "sort_values": lambda df: df.sort_values("prix", inplace=True),
+    "drop": lambda df: df.drop(columns="prix", inplace=True),
+    "update": lambda df: df.update(pd.DataFrame({"prix": [9.0]})),
+}
+
+
+def _table():
+    return freeze(pd.DataFrame({"prix": [80.0, np.nan, 120.0],
+                                "quartier": ["Louvre", "Temple", "Opéra"]}))
+
+
+@pytest.mark.parametrize("ecriture", ECRITURES.values(), ids=ECRITURES.keys())
+def test_ecriture_en_place_refusee(ecriture):
+    df = _table()
+    with pytest.raises(TypeError):
+        ecriture(df)
+    pd.testing.assert_frame_equal(pd.DataFrame(df), pd.DataFrame(_table()))
+
+
+def test_tableaux_non_modifiables():
+    with pytest.raises(ValueError):
+        _table()["prix"].to_numpy()[0] = 0
+
+
+def test_resultats_derives_modifiables():
+    df = _table()
+    copie = df.reset_index(drop=True)
+    copie["prix"] = 0
+    copie.columns = ["p", "q"]
+    assert type(copie) is pd.DataFrame
+    assert df["prix"].iloc[0] == 80.0
+
+
+def test_version_conservee():
+    df = pd.DataFrame({"prix": [80.0]})
+    df.attrs["version"] = "courant"
+    assert freeze(df).attrs["version"] == "courant"